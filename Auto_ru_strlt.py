@@ -1,15 +1,36 @@
 import streamlit as st
 import pandas as pd
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from webdriver_manager.chrome import ChromeDriverManager
-from bs4 import BeautifulSoup
+import atexit
 import time
-import re
+import uuid
+from collections import namedtuple
+
+from auto_parser.drivers import DriverPool
+from auto_parser.fetchers import make_fetcher
+from auto_parser.filters import TRANSMISSION_PARAMS, filter_spec, filtered_url
+from auto_parser.jobs import ACTIVE, CANCELLED, DONE, FAILED, QUEUED, RUNNING, JobQueue
+from auto_parser.metrics import METRICS
+from auto_parser.page_cache import CachingFetcher, PageCache, ReplayFetcher
+from auto_parser.results_cache import ResultsCache
+from auto_parser.scheduler import RateLimiter
+from auto_parser.scraper import CAPTCHA, ERROR, FINISHED, LOAD_FAILED, PAGE_DONE, detect_parser_type, scrape
+from auto_parser.settings import CACHE_DIR, RESULTS_DIR
+from auto_parser.sinks import ParquetSink
+from auto_parser.spec_cache import SpecCache
+from auto_parser.stats import dataset_hash, price_ranges
+from auto_parser.store import ListingStore
+
+MAX_WORKERS = 8
+PAGES_PER_DRIVER = 50  # Restart Chrome after this many pages to keep memory in check
+LIVE_ROWS = 200  # Rows shown in the live table while scraping
+PAGE_CACHE_TTL = 10 * 60  # Seconds a fetched page is reused before refetching
+RESULTS_TTL = 15 * 60  # Seconds a finished scrape is served to repeated requests
+JOB_WORKERS = 4  # Background scrapes running at once
+PAGE_RATE = 2.0  # Page requests per second, shared by all sessions (and separately by all background jobs)
+JOBS_SHOWN = 10
+JOBS_REFRESH = 2  # Seconds between job status polls
+
+ScrapeResult = namedtuple('ScrapeResult', 'frame disappeared path')
 
 # Page config
 st.set_page_config(
@@ -28,359 +49,324 @@ url_input = st.text_input(
     help="Вставьте ссылку с Auto.ru. Приложение автоматически определит новые или б/у автомобили."
 )
 
-def setup_driver():
-    """Setup Selenium WebDriver"""
-    options = Options()
-    options.add_argument("--start-maximized")
-    options.add_argument("--disable-blink-features=AutomationControlled")
-    options.add_argument("--headless")  # Run in headless mode for Streamlit
-    options.add_argument("--no-sandbox")
-    options.add_argument("--disable-dev-shm-usage")
-    
-    service = Service(ChromeDriverManager().install())
-    return webdriver.Chrome(service=service, options=options)
+workers = st.slider(
+    "Параллельных браузеров:",
+    min_value=1,
+    max_value=MAX_WORKERS,
+    value=3,
+    help="Сколько экземпляров Chrome одновременно загружают страницы выдачи."
+)
 
-def parse_new_vehicles(base_url):
-    """Parser for new vehicles"""
-    driver = setup_driver()
-    
-    def parse_page(url):
-        driver.get(url)
+max_pages = st.number_input(
+    "Максимум страниц (0 — все):",
+    min_value=0,
+    value=0,
+    help="Число страниц выдачи определяется по первой странице; здесь можно ограничить его."
+)
 
-        try:
-            WebDriverWait(driver, 5).until(
-                EC.presence_of_element_located((By.XPATH, "//iframe[contains(@src, 'captcha')]"))
-            )
-            st.warning("Обнаружена капча. При необходимости обработайте вручную.")
-            return []
-        except:
-            pass  # No captcha found
+incremental = st.checkbox(
+    "Только изменения с прошлого запуска",
+    help="Показывает новые, подорожавшие/подешевевшие и исчезнувшие объявления и прекращает листать выдачу на первой странице без изменений."
+)
 
-        try:
-            WebDriverWait(driver, 10).until(
-                EC.presence_of_element_located((By.CLASS_NAME, 'CardGroupListingItem'))
-            )
-        except:
+background = st.checkbox(
+    "Запустить в фоне",
+    help="Парсинг идёт в отдельном процессе: страницу можно закрыть, а результаты забрать позже в разделе «Фоновые задачи»."
+)
+
+TRANSMISSION_LABELS = {
+    'AT': "Автомат",
+    'MT': "Механика",
+    'AMT': "Робот",
+    'CVT': "Вариатор",
+}
+with st.expander("🔎 Фильтры"):
+    st.caption("Фильтры добавляются в запрос к Auto.ru, поэтому узкий поиск загружает меньше страниц.")
+    max_mileage = st.number_input(
+        "Пробег до, км (только б/у, 0 — без ограничения):",
+        min_value=0,
+        value=1000,
+        step=1000
+    )
+    year_col, price_col = st.columns(2)
+    with year_col:
+        year_from = st.number_input("Год от:", min_value=0, value=0, help="0 — без ограничения")
+        year_to = st.number_input("Год до:", min_value=0, value=0, help="0 — без ограничения")
+    with price_col:
+        price_from = st.number_input("Цена от, ₽:", min_value=0, value=0, step=100_000, help="0 — без ограничения")
+        price_to = st.number_input("Цена до, ₽:", min_value=0, value=0, step=100_000, help="0 — без ограничения")
+    transmissions = st.multiselect(
+        "Коробка передач:",
+        options=list(TRANSMISSION_PARAMS),
+        format_func=TRANSMISSION_LABELS.get,
+        placeholder="Любая"
+    )
+
+FETCH_BACKENDS = {
+    'http': "HTTP, браузер только при капче",
+    'browser': "Только браузер",
+    'replay': "Из кэша страниц (офлайн)",
+}
+backend = st.radio(
+    "Способ загрузки:",
+    options=list(FETCH_BACKENDS),
+    format_func=FETCH_BACKENDS.get,
+    horizontal=True,
+    help="HTTP-загрузка занимает десятки миллисекунд; Chrome запускается, только если сайт показал капчу или пустую выдачу. "
+         "Офлайн-режим повторяет парсинг по ранее скачанным страницам без обращения к сайту."
+)
+
+@st.cache_resource
+def get_driver_pool():
+    """Long-lived driver pool shared by all reruns and sessions"""
+    pool = DriverPool(MAX_WORKERS, max_pages=PAGES_PER_DRIVER)
+    atexit.register(pool.close)
+    return pool
+
+@st.cache_resource
+def get_spec_cache():
+    """Parsed-spec cache persisted between runs"""
+    return SpecCache(path=CACHE_DIR / 'specs.sqlite')
+
+PRICE_STATS_LABELS = {
+    'min_price': "Мин. цена",
+    'max_price': "Макс. цена",
+    'count': "Кол-во",
+    'mode_price': "Частая цена",
+    'engine_volume': "Объём, л",
+    'power': "Мощность, л.с.",
+    'fuel_type': "Топливо",
+    'transmission': "КПП",
+    'drive': "Привод",
+    'potential_price': "Потенциальная цена",
+}
+
+@st.cache_data(show_spinner=False, max_entries=16)
+def cached_price_ranges(digest, _df, key):
+    """price_ranges() memoized on the dataset hash; the frame itself is not hashed"""
+    return price_ranges(_df, key)
+
+@st.cache_resource
+def get_page_cache():
+    """Raw page cache shared by all sessions"""
+    return PageCache(CACHE_DIR / 'pages', ttl=PAGE_CACHE_TTL)
+
+@st.cache_resource
+def get_rate_limiter():
+    """Request budget shared by every session and backend"""
+    return RateLimiter(PAGE_RATE, burst=max(1, int(PAGE_RATE)))
+
+@st.cache_resource
+def get_fetcher(backend):
+    """Shared page fetcher for the selected backend"""
+    if backend == 'replay':
+        return ReplayFetcher(get_page_cache())
+    return CachingFetcher(
+        make_fetcher(backend, MAX_WORKERS, limiter=get_rate_limiter(), pool=get_driver_pool()), get_page_cache()
+    )
+
+@st.cache_resource
+def get_results_cache():
+    """Finished scrapes shared by all sessions"""
+    return ResultsCache(ttl=RESULTS_TTL)
+
+@st.cache_resource
+def get_job_queue():
+    """Background scrape jobs shared by all sessions"""
+    queue = JobQueue(CACHE_DIR / 'jobs.sqlite', workers=JOB_WORKERS, rate=PAGE_RATE)
+    atexit.register(queue.close)
+    return queue
+
+@st.cache_resource
+def get_listing_store():
+    """Listings seen by previous runs, for incremental re-scrapes"""
+    return ListingStore(CACHE_DIR / 'listings.sqlite')
+
+def report_incomplete(incomplete):
+    """Tell the user how many cards were missing some fields"""
+    if incomplete:
+        st.info(f"В {incomplete} карточках не хватает части полей — они оставлены пустыми.")
+
+def streamlit_progress():
+    """Progress callback that renders scrape events with Streamlit widgets"""
+    progress_bar = None
+
+    def progress(event):
+        nonlocal progress_bar
+        if event.stage == PAGE_DONE:
+            if event.pages > 1:
+                if progress_bar is None:
+                    progress_bar = st.progress(0)
+                progress_bar.progress(min(event.page / event.pages, 1.0))
+        elif event.stage == CAPTCHA:
+            st.warning("Обнаружена капча. При необходимости обработайте вручную.")
+        elif event.stage == LOAD_FAILED:
             st.error("Не удалось загрузить элементы страницы")
-            return []
-
-        html = driver.page_source
-        soup = BeautifulSoup(html, 'html.parser')
-
-        model_links = soup.find_all('a', class_='Link CardGroupListingItem__titleLink')
-        brand_element = soup.find('h1', class_='CardGroupHeaderDesktop__title-nZZMr')
-        brand_name = brand_element.text.strip().replace("Купить", "")[:-10] if brand_element else "Unknown"
-        prices = soup.find_all('span', class_='OfferPriceCaption__price')
-        dealers = soup.find_all('a', class_='Link CardGroupListingItemFooter__dealerName')
-        specs = soup.find_all('div', class_='CardGroupListingItem__techSummary')
-        stocks = soup.find_all('ul', class_='CardGroupListingItem__horizontalList')
-        cities = soup.find_all('span', class_='MetroListPlace__regionName MetroListPlace_nbsp')
-
-        data = []
-        min_length = min(len(model_links), len(prices), len(dealers), len(specs), len(stocks), len(cities))
-        
-        for i in range(min_length):
-            model_name = model_links[i].text.strip()
-            price_value = prices[i].text.strip()
-            dealer_value = dealers[i].text.strip()
-            specs_value = ' '.join(div.get_text(strip=True) for div in specs[i].find_all('div'))
-            stock_value = stocks[i].text.strip()
-            city_value = cities[i].text.strip()
-            data.append([brand_name, model_name, price_value, dealer_value, specs_value, stock_value, city_value])
-
-        return data
-
-    # Parse pages
-    all_data = []
+        elif event.stage == ERROR:
+            st.error(f"Ошибка на странице {event.page}: {event.error}")
+        elif event.stage == FINISHED:
+            report_incomplete(event.incomplete)
+
+    return progress
+
+JOB_STATUS_LABELS = {
+    QUEUED: "в очереди",
+    RUNNING: "выполняется",
+    DONE: "готово",
+    FAILED: "ошибка",
+    CANCELLED: "отменено",
+}
+
+@st.fragment(run_every=JOBS_REFRESH)
+def jobs_panel():
+    """Recent background jobs; only this panel reruns while polling"""
+    jobs = get_job_queue().jobs(limit=JOBS_SHOWN)
+    if not jobs:
+        return
+    st.header("📋 Фоновые задачи")
+    for job in jobs:
+        info_col, status_col, action_col = st.columns([5, 3, 1])
+        info_col.write(f"**#{job.id}** {job.url}")
+        with status_col:
+            if job.status == RUNNING and job.pages:
+                st.progress(min(job.page / job.pages, 1.0), text=f"Стр. {job.page}/{job.pages}, строк: {job.rows}")
+            else:
+                st.write(f"{JOB_STATUS_LABELS[job.status]}, строк: {job.rows}")
+            if job.error:
+                st.caption(job.error)
+        with action_col:
+            if job.status in ACTIVE:
+                if st.button("Отменить", key=f"cancel_{job.id}"):
+                    get_job_queue().cancel(job.id)
+            elif job.path and st.button("Открыть", key=f"open_{job.id}"):
+                st.session_state['open_job'] = job.id
+                st.rerun()
+
+def scrape_results(url, parser_type, backend, workers, incremental, max_pages, filters):
+    """Scrape url while showing progress and the latest rows"""
+    run = get_listing_store().begin(url)
+    pages = scrape(
+        url, parser_type, get_fetcher(backend), run, workers, incremental,
+        spec_cache=get_spec_cache(), progress=streamlit_progress(),
+        max_pages=max_pages or None, filters=filters
+    )
     
-    # First page
-    with st.spinner("Парсинг первой страницы..."):
-        page_data = parse_page(base_url)
-        all_data.extend(page_data)
-
-    # Check for pagination
-    html = driver.page_source
-    soup = BeautifulSoup(html, 'html.parser')
-    pagination = soup.find_all('a', class_='Button Button_color_whiteHoverBlue Button_disabled Button_checked Button_size_s Button_type_link Button_width_default ListingPagination__page')
-
-    if pagination:
-        progress_bar = st.progress(0)
-        for page_num in range(2, 11):  # Limit to 10 pages for demo
-            url = f"{base_url}?page={page_num}"
-            try:
-                with st.spinner(f"Парсинг страницы {page_num}..."):
-                    page_data = parse_page(url)
-                    if not page_data:
-                        break
-                    all_data.extend(page_data)
-                    progress_bar.progress(min(page_num / 10, 1.0))
-            except Exception as e:
-                st.error(f"Ошибка на странице {page_num}: {e}")
-                break
-
-    driver.quit()
+    # Every page is written as a row group as soon as it is parsed and is not
+    # kept in memory; the typed result is read back from the file once the
+    # scrape is over. The random suffix keeps sessions started in the same
+    # second from writing to one file
+    sink_path = RESULTS_DIR / f"auto_ru_{parser_type}_{time.strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:8]}.parquet"
+    live_caption = st.empty()
+    live_table = st.empty()
+    try:
+        with ParquetSink(sink_path, batch_rows=1) as sink, st.spinner(f"Парсинг ({workers} потоков)..."):
+            for frame in pages:
+                sink.write(frame)
+                live_caption.caption(f"Получено строк: {sink.rows}. Последние записи:")
+                live_table.dataframe(frame.tail(LIVE_ROWS), use_container_width=True)
+    finally:
+        live_caption.empty()
+        live_table.empty()
     
-    # Create DataFrame
-    df = pd.DataFrame(all_data, columns=['Модель', 'Комплектация', 'Цена', 'Дилер', 'Спецификация', 'Наличие', 'Город'])
+    if not sink.rows:
+        return ScrapeResult(pd.DataFrame(), run.disappeared, None)
+    return ScrapeResult(pd.read_parquet(sink_path), run.disappeared, sink_path)
+
+def show_results(result, parser_type, incremental, key='scrape'):
+    """Render a finished scrape: tables, statistics and downloads; `key` tells widgets of several results apart"""
+    df = result.frame
+    if result.path is not None:
+        st.caption(f"Результаты сохранены в {result.path}")
     
-    # Parse specifications
-    if not df.empty:
-        df = parse_specifications(df)
-        # Clean price data
-        df['Цена'] = df['Цена'].str.replace(r'[^\d]', '', regex=True)
-        df['Цена'] = pd.to_numeric(df['Цена'], errors='coerce')
-    
-    return df
-
-def parse_used_vehicles(base_url):
-    """Parser for used vehicles"""
-    driver = setup_driver()
-    
-    def parse_page(url):
-        driver.get(url)
-
-        try:
-            WebDriverWait(driver, 5).until(
-                EC.presence_of_element_located((By.XPATH, "//iframe[contains(@src, 'captcha')]"))
+    if result.disappeared:
+        st.subheader(f"🚫 Исчезли с прошлого запуска: {len(result.disappeared)}")
+        st.dataframe(
+            pd.DataFrame(result.disappeared).drop(columns='missing', errors='ignore'),
+            use_container_width=True
+        )
+
+    if df.empty and incremental:
+        st.info("Новых и изменившихся объявлений нет.")
+    elif not df.empty:
+        st.success(f"Успешно спарсено {len(df)} автомобилей!")
+
+        # Display results
+        col1, col2 = st.columns(2)
+
+        with col1:
+            st.subheader("📊 Данные")
+            st.dataframe(df, use_container_width=True)
+
+        with col2:
+            st.subheader("📈 Статистика")
+            if 'Цена' in df.columns:
+                price_col = df['Цена'].dropna()
+                if not price_col.empty:
+                    st.metric("Средняя цена", f"{price_col.mean():,.0f} ₽")
+                    st.metric("Минимальная цена", f"{price_col.min():,.0f} ₽")
+                    st.metric("Максимальная цена", f"{price_col.max():,.0f} ₽")
+
+            # Price range by complectation with specifications
+            complectation_col = 'Комплектация' if parser_type == 'new' else 'Модель'
+            if complectation_col in df.columns and 'Цена' in df.columns:
+                st.write("**Диапазон цен по комплектациям:**")
+
+                price_stats = cached_price_ranges(dataset_hash(df), df, complectation_col)
+                price_column = st.column_config.NumberColumn(format="%d ₽")
+                st.dataframe(
+                    price_stats.head(10).rename(columns=PRICE_STATS_LABELS),  # Show top 10
+                    hide_index=True,
+                    use_container_width=True,
+                    column_config={
+                        PRICE_STATS_LABELS[column]: price_column
+                        for column in ('min_price', 'max_price', 'mode_price', 'potential_price')
+                    },
+                )
+
+            if 'Город' in df.columns:
+                st.write("**Топ городов:**")
+                city_counts = df['Город'].value_counts().head(5)
+                for city, count in city_counts.items():
+                    st.write(f"• {city}: {count}")
+
+            # Additional stats for used vehicles
+            if parser_type == 'used':
+                if 'Год выпуска' in df.columns:
+                    year_col = df['Год выпуска'].dropna()
+                    if not year_col.empty:
+                        st.write("**Диапазон годов:**")
+                        st.write(f"• Самый новый: {year_col.max()}")
+                        st.write(f"• Самый старый: {year_col.min()}")
+
+                if 'transmission' in df.columns:
+                    st.write("**Коробки передач:**")
+                    trans_counts = df['transmission'].value_counts().head(3)
+                    for trans, count in trans_counts.items():
+                        if pd.notna(trans) and count:
+                            st.write(f"• {trans}: {count}")
+
+        # Download buttons
+        csv_col, parquet_col = st.columns(2)
+        with csv_col:
+            csv = df.to_csv(index=False, encoding='utf-8-sig')
+            st.download_button(
+                label="📥 Скачать CSV",
+                data=csv,
+                file_name=f"auto_ru_{parser_type}_vehicles.csv",
+                mime="text/csv",
+                key=f"{key}_csv"
             )
-            st.warning("Captcha detected. Please handle manually if needed.")
-            return []
-        except:
-            pass  # No captcha found
-
-        try:
-            WebDriverWait(driver, 10).until(
-                EC.presence_of_element_located((By.CLASS_NAME, 'ListingItem__title'))
+        with parquet_col:
+            st.download_button(
+                label="📥 Скачать Parquet",
+                data=df.to_parquet(index=False, compression='zstd'),
+                file_name=f"auto_ru_{parser_type}_vehicles.parquet",
+                mime="application/vnd.apache.parquet",
+                help="Типизированные колонки: цены и пробег — целые числа, города и дилеры — категории",
+                key=f"{key}_parquet"
             )
-        except:
-            st.error("Failed to load page elements")
-            return []
-
-        html = driver.page_source
-        soup = BeautifulSoup(html, 'html.parser')
-
-        model_blocks = soup.find_all('div', class_='ListingItem__title')
-        specs_blocks = soup.find_all('div', class_='ListingItemTechSummaryDesktop ListingItem__techSummary')
-        cities = soup.find_all('span', class_='MetroListPlace__regionName MetroListPlace_nbsp')
-        years = soup.find_all('div', class_='ListingItem__year')
-        mileages = soup.find_all('div', class_='ListingItem__kmAge')
-        prices = soup.find_all('div', class_='ListingItemPrice__content')
-
-        brand_name_tag = soup.find('h1', class_='CardGroupHeaderDesktop__title-nZZMr')
-        brand_name = brand_name_tag.text.strip().replace("Купить", "")[:-10] if brand_name_tag else "Неизвестно"
-
-        data = []
-        min_length = min(len(model_blocks), len(specs_blocks), len(cities), len(years), len(mileages), len(prices))
-
-        for i in range(min_length):
-            model_name = model_blocks[i].get_text(strip=True)
-            specs_value = ' '.join(div.get_text(strip=True) for div in specs_blocks[i].find_all('div'))
-            city_value = cities[i].text.strip()
-            year_value = years[i].text.strip()
-            mileage_value = mileages[i].text.strip().replace('\xa0', ' ').replace('км', '').strip()
-            price_value = prices[i].text.strip().replace('\xa0', ' ').replace('₽', '').strip()
-
-            # Filter out high mileage (over 1000 km as per your logic)
-            try:
-                mileage_num = int(mileage_value.replace(' ', '').replace(',', ''))
-                if mileage_num > 1000:
-                    continue
-            except:
-                continue
-
-            data.append([brand_name, model_name, specs_value, city_value, year_value, mileage_value, price_value])
-
-        return data
-
-    # Parse pages
-    all_data = []
-    
-    # First page
-    with st.spinner("Parsing first page..."):
-        page_data = parse_page(base_url)
-        all_data.extend(page_data)
-
-    # Check for pagination
-    html = driver.page_source
-    soup = BeautifulSoup(html, 'html.parser')
-    pagination = soup.find_all('a', class_='Button Button_color_whiteHoverBlue Button_disabled Button_checked Button_size_s Button_type_link Button_width_default ListingPagination__page')
-
-    if pagination:
-        progress_bar = st.progress(0)
-        for page_num in range(2, 11):  # Limit to 10 pages for demo
-            url = f"{base_url}?page={page_num}"
-            try:
-                with st.spinner(f"Parsing page {page_num}..."):
-                    page_data = parse_page(url)
-                    if not page_data:
-                        break
-                    all_data.extend(page_data)
-                    progress_bar.progress(min(page_num / 10, 1.0))
-            except Exception as e:
-                st.error(f"Error on page {page_num}: {e}")
-                break
-
-    driver.quit()
-    
-    # Create DataFrame
-    columns = ['Марка', 'Модель', 'Спецификация', 'Город', 'Год выпуска', 'Пробег', 'Цена']
-    df = pd.DataFrame(all_data, columns=columns)
-    
-    # Parse specifications for used vehicles
-    if not df.empty:
-        df = parse_used_specifications(df)
-        # Clean price data
-        df['Цена'] = df['Цена'].str.replace(r'[^\d]', '', regex=True)
-        df['Цена'] = pd.to_numeric(df['Цена'], errors='coerce')
-    
-    return df
-
-def parse_used_specifications(df):
-    """Parse used vehicle specifications"""
-    trans_dict = {
-        'механика': 'MT',
-        'механическая': 'MT',
-        'вариатор': 'CVT',
-        'робот': 'AMT',
-        'автомат': 'AT',
-        'акпп': 'AT',
-        'cvt': 'CVT'
-    }
-
-    def parse_row(text):
-        result = {}
-
-        # Engine volume, power, fuel
-        match = re.search(r'(\d+\.\d)\s*л.?[\s\u2009]*/[\s\u2009]*(\d+)\s*л\.с\..?/[\s\u2009]*(\w+)', text)
-        if match:
-            result['engine_volume'] = match.group(1)
-            result['power'] = int(match.group(2))
-            result['fuel_type'] = match.group(3)
-
-        # Transmission
-        for word, code in trans_dict.items():
-            if re.search(rf'\b{word}\b', text, flags=re.IGNORECASE):
-                result['transmission'] = code
-                break
-        else:
-            result['transmission'] = None
-
-        # Drive type
-        if 'передний' in text:
-            result['drive'] = 'FWD'
-        elif 'полный' in text:
-            result['drive'] = 'AWD'
-        elif 'задний' in text:
-            result['drive'] = 'RWD'
-        else:
-            result['drive'] = None
-
-        # Color
-        drive_match = re.search(r'(передний|полный|задний)\s+(\w+)', text)
-        if drive_match:
-            result['color'] = drive_match.group(2)
-
-        # Base options
-        base_match = re.search(r'(\d+)\s+базов\w* опц\w*', text)
-        if base_match:
-            result['base_options'] = int(base_match.group(1))
-
-        # Extra options
-        extra_match = re.search(r'(\d+)\s+доп\.?\s+опц\w*', text)
-        if extra_match:
-            result['extra_options'] = int(extra_match.group(1))
-
-        return pd.Series(result)
-
-    parsed = df['Спецификация'].apply(parse_row)
-    # Drop 'Марка' column and concat with parsed data
-    df_without_marka = df.drop(columns=['Марка']) if 'Марка' in df.columns else df
-    return pd.concat([df_without_marka, parsed], axis=1)
-
-def parse_specifications(df):
-    """Parse new vehicle specifications"""
-    trans_dict = {
-        'механика': 'MT',
-        'механическая': 'MT',
-        'вариатор': 'CVT',
-        'робот': 'AMT',
-        'автомат': 'AT',
-        'акпп': 'AT',
-        'cvt': 'CVT'
-    }
-
-    fuel_dict = {
-        'дизель': 'Дизель',
-        'бензин': 'Бензин',
-        'электро': 'Электро',
-        'гибрид': 'Гибрид',
-        'газ': 'Газ'
-    }
-
-    def parse_row(text):
-        result = {}
-
-        # Engine volume and power
-        match = re.search(r'(\d+\.\d)\s*л.?[\s\u2009]*/[\s\u2009]*(\d+)\s*л\.с\.', text)
-        if match:
-            result['engine_volume'] = match.group(1)
-            result['power'] = int(match.group(2))
-
-        # Fuel type
-        for key, value in fuel_dict.items():
-            if key in text.lower():
-                result['fuel_type'] = value
-                break
-        else:
-            result['fuel_type'] = None
-
-        # Transmission
-        for word, code in trans_dict.items():
-            if re.search(rf'\b{word}\b', text, flags=re.IGNORECASE):
-                result['transmission'] = code
-                break
-        else:
-            result['transmission'] = None
-
-        # Drive type
-        if 'передний' in text:
-            result['drive'] = 'FWD'
-        elif 'полный' in text:
-            result['drive'] = 'AWD'
-        elif 'задний' in text:
-            result['drive'] = 'RWD'
-        else:
-            result['drive'] = None
-
-        # Color
-        drive_match = re.search(r'(передний|полный|задний)\s+(\w+)', text)
-        if drive_match:
-            result['color'] = drive_match.group(2)
-
-        # Base options
-        base_match = re.search(r'(\d+)\s+базов\w* опц\w*', text)
-        if base_match:
-            result['base_options'] = int(base_match.group(1))
-
-        # Extra options
-        extra_match = re.search(r'(\d+)\s+доп\.?\s+опц\w*', text)
-        if extra_match:
-            result['extra_options'] = int(extra_match.group(1))
-
-        return pd.Series(result)
-
-    parsed = df['Спецификация'].apply(parse_row)
-    return pd.concat([df, parsed], axis=1)
-
-def detect_parser_type(url):
-    """Detect if URL is for new or used vehicles"""
-    url_lower = url.lower()
-    if 'new' in url_lower:
-        return 'new'
-    elif 'used' in url_lower:
-        return 'used'
     else:
-        return None
+        st.warning("Данные не найдены. Проверьте URL или попробуйте снова.")
 
 # Main app logic
 if url_input:
@@ -395,128 +381,67 @@ if url_input:
             vehicle_type = "НОВЫЕ" if parser_type == 'new' else "Б/У"
             st.success(f"Обнаружены: **{vehicle_type}** автомобили")
             
-            if st.button("🚀 Начать парсинг", type="primary"):
+            # Zero means "no limit" for every field; filter_spec keeps the defaults for None
+            filters = filter_spec(
+                parser_type, max_mileage=max_mileage, min_year=year_from or None, max_year=year_to or None,
+                min_price=price_from or None, max_price=price_to or None, transmissions=tuple(transmissions)
+            )
+            # The filters are part of the search URL, and so of the cache key
+            search_url = filtered_url(url_input, filters, parser_type)
+            # Offline replays and live fetches of one URL are different results
+            request = ResultsCache.key(search_url, parser_type, backend, max_pages, incremental)
+            refresh = st.session_state.pop('refresh_results', False)
+            start = st.button("🚀 Начать парсинг", type="primary")
+            if start and background:
+                job_id = get_job_queue().submit(
+                    search_url, parser_type, backend=backend, workers=workers,
+                    incremental=incremental, max_pages=max_pages or None, filters=filters._asdict(),
+                    cache_ttl=PAGE_CACHE_TTL
+                )
+                st.success(f"Задача #{job_id} поставлена в очередь. Следите за ней в разделе «Фоновые задачи».")
+            elif start or refresh:
+                def compute():
+                    return scrape_results(search_url, parser_type, backend, workers, incremental, max_pages, filters)
+
                 try:
-                    if parser_type == 'new':
-                        df = parse_new_vehicles(url_input)
+                    if incremental:
+                        # Changes since the previous run are only reported once
+                        finished_at, result = time.time(), compute()
                     else:
-                        df = parse_used_vehicles(url_input)
-                    
-                    if not df.empty:
-                        st.success(f"Успешно спарсено {len(df)} автомобилей!")
-                        
-                        # Display results
-                        col1, col2 = st.columns(2)
-                        
-                        with col1:
-                            st.subheader("📊 Данные")
-                            st.dataframe(df, use_container_width=True)
-                        
-                        with col2:
-                            st.subheader("📈 Статистика")
-                            if 'Цена' in df.columns:
-                                price_col = df['Цена'].dropna()
-                                if not price_col.empty:
-                                    st.metric("Средняя цена", f"{price_col.mean():,.0f} ₽")
-                                    st.metric("Минимальная цена", f"{price_col.min():,.0f} ₽")
-                                    st.metric("Максимальная цена", f"{price_col.max():,.0f} ₽")
-                            
-                            # Price range by complectation with specifications
-                            complectation_col = 'Комплектация' if parser_type == 'new' else 'Модель'
-                            if complectation_col in df.columns and 'Цена' in df.columns:
-                                st.write("**Диапазон цен по комплектациям:**")
-                                
-                                # Group by complectation and get stats
-                                price_stats = df.groupby(complectation_col).agg({
-                                    'Цена': ['min', 'max', 'count', lambda x: x.mode().iloc[0] if not x.mode().empty else x.median()],
-                                    'engine_volume': lambda x: x.mode().iloc[0] if 'engine_volume' in df.columns and not x.dropna().empty and not x.dropna().mode().empty else None,
-                                    'power': lambda x: x.mode().iloc[0] if 'power' in df.columns and not x.dropna().empty and not x.dropna().mode().empty else None,
-                                    'fuel_type': lambda x: x.mode().iloc[0] if 'fuel_type' in df.columns and not x.dropna().empty and not x.dropna().mode().empty else None,
-                                    'transmission': lambda x: x.mode().iloc[0] if 'transmission' in df.columns and not x.dropna().empty and not x.dropna().mode().empty else None,
-                                    'drive': lambda x: x.mode().iloc[0] if 'drive' in df.columns and not x.dropna().empty and not x.dropna().mode().empty else None
-                                }).reset_index()
-                                
-                                # Flatten column names
-                                price_stats.columns = [
-                                    complectation_col, 'min_price', 'max_price', 'count', 'mode_price',
-                                    'engine_volume', 'power', 'fuel_type', 'transmission', 'drive'
-                                ]
-                                
-                                # Calculate potential price using the formula
-                                price_stats['potential_price'] = price_stats['mode_price'].apply(
-                                    lambda x: int(round((x * 0.97 / 0.85 + 250_000) / 1000) * 1000) if pd.notnull(x) else None
-                                )
-                                
-                                price_stats = price_stats.sort_values('min_price')
-                                
-                                for _, row in price_stats.head(10).iterrows():  # Show top 10
-                                    complectation = row[complectation_col]
-                                    min_price = row['min_price']
-                                    max_price = row['max_price']
-                                    count = row['count']
-                                    potential_price = row['potential_price']
-                                    
-                                    # Build specifications string
-                                    specs = []
-                                    if pd.notnull(row['engine_volume']):
-                                        specs.append(f"{row['engine_volume']}л")
-                                    if pd.notnull(row['power']):
-                                        specs.append(f"{int(row['power'])}л.с.")
-                                    if pd.notnull(row['fuel_type']):
-                                        specs.append(str(row['fuel_type']))
-                                    if pd.notnull(row['transmission']):
-                                        specs.append(str(row['transmission']))
-                                    if pd.notnull(row['drive']):
-                                        specs.append(str(row['drive']))
-                                    
-                                    specs_str = " | ".join(specs) if specs else ""
-                                    
-                                    # Display complectation info
-                                    if min_price == max_price:
-                                        price_display = f"{min_price:,.0f} ₽"
-                                    else:
-                                        price_display = f"{min_price:,.0f} - {max_price:,.0f} ₽"
-                                    
-                                    potential_display = f" → **{potential_price:,.0f} ₽**" if potential_price else ""
-                                    specs_display = f" ({specs_str})" if specs_str else ""
-                                    
-                                    st.write(f"• **{complectation}**{specs_display}: {price_display}{potential_display} ({count} шт.)")
-                            
-                            if 'Город' in df.columns:
-                                st.write("**Топ городов:**")
-                                city_counts = df['Город'].value_counts().head(5)
-                                for city, count in city_counts.items():
-                                    st.write(f"• {city}: {count}")
-                            
-                            # Additional stats for used vehicles
-                            if parser_type == 'used':
-                                if 'Год выпуска' in df.columns:
-                                    year_col = df['Год выпуска'].dropna()
-                                    if not year_col.empty:
-                                        st.write("**Диапазон годов:**")
-                                        st.write(f"• Самый новый: {year_col.max()}")
-                                        st.write(f"• Самый старый: {year_col.min()}")
-                                
-                                if 'transmission' in df.columns:
-                                    st.write("**Коробки передач:**")
-                                    trans_counts = df['transmission'].value_counts().head(3)
-                                    for trans, count in trans_counts.items():
-                                        if pd.notna(trans):
-                                            st.write(f"• {trans}: {count}")
-                        
-                        # Download button
-                        csv = df.to_csv(index=False, encoding='utf-8-sig')
-                        st.download_button(
-                            label="📥 Скачать CSV",
-                            data=csv,
-                            file_name=f"auto_ru_{parser_type}_vehicles.csv",
-                            mime="text/csv"
-                        )
-                    else:
-                        st.warning("Данные не найдены. Проверьте URL или попробуйте снова.")
-                        
+                        results_cache = get_results_cache()
+                        if results_cache.running(request):
+                            with st.spinner("Этот URL уже парсится в другой сессии, ожидаем результат..."):
+                                finished_at, result = results_cache.run(request, compute, refresh)
+                        else:
+                            finished_at, result = results_cache.run(request, compute, refresh)
+                    st.session_state['results'] = (request, finished_at, result)
                 except Exception as e:
                     st.error(f"Ошибка во время парсинга: {str(e)}")
+            
+            # Results survive reruns caused by other widgets
+            stored = st.session_state.get('results')
+            if stored is not None and stored[0] == request:
+                _, finished_at, result = stored
+                if not incremental:
+                    st.caption(
+                        f"Результаты от {time.strftime('%H:%M:%S', time.localtime(finished_at))}. "
+                        f"Повторные запросы этого URL в течение {RESULTS_TTL // 60} мин берутся из кэша."
+                    )
+                    st.button("🔄 Обновить", on_click=lambda: st.session_state.update(refresh_results=True))
+                show_results(result, parser_type, incremental)
+
+# Background jobs
+jobs_panel()
+open_job = st.session_state.get('open_job')
+if open_job is not None:
+    job = get_job_queue().get(open_job)
+    job_frame = get_job_queue().result(open_job) if job else None
+    if job_frame is None:
+        st.warning(f"Результаты задачи #{open_job} недоступны.")
+    else:
+        st.header(f"📦 Результаты задачи #{job.id}")
+        st.caption(job.url)
+        show_results(ScrapeResult(job_frame, [], job.path), job.kind, job.options.get('incremental', False), key=f"job_{job.id}")
 
 # Sidebar with info
 with st.sidebar:
@@ -530,12 +455,48 @@ with st.sidebar:
     **Поддерживаемые URL:**
     - Новые автомобили: URL содержащие "new"
     - Б/У автомобили: URL содержащие "used"
+    
+    **Без веб-интерфейса:**
+    `python -m auto_parser urls.txt -o results`
     """)
     
+    spec_stats = get_spec_cache().stats()
+    if spec_stats['hits'] or spec_stats['misses']:
+        st.header("🗂️ Кэш характеристик")
+        st.metric("Попадания в кэш", f"{spec_stats['hit_rate']:.0%}")
+        st.caption(f"Попаданий: {spec_stats['hits']}, промахов: {spec_stats['misses']}, в памяти: {spec_stats['size']}")
+    
+    metrics = METRICS.snapshot()
+    if metrics['timers']:
+        st.header("⏱️ Производительность")
+        stages = pd.DataFrame.from_dict(metrics['timers'], orient='index')
+        stages = stages.assign(
+            mean=stages['mean'] * 1000, max=stages['max'] * 1000, total=stages['total']
+        )[['count', 'mean', 'max', 'total']].rename(columns={
+            'count': "Раз", 'mean': "Сред., мс", 'max': "Макс., мс", 'total': "Всего, с"
+        })
+        st.dataframe(stages.round(1), use_container_width=True)
+        counters = metrics['counters']
+        st.caption(
+            f"Страниц: {counters.get('pages', 0)}, пустых: {counters.get('empty_pages', 0)}, "
+            f"капч: {counters.get('captcha', 0)}, не загрузилось: {counters.get('load_failed', 0)}, "
+            f"неполных карточек: {counters.get('incomplete_cards', 0)}, "
+            f"отброшено фильтрами: {counters.get('filtered_out', 0)}, "
+            f"с нечитаемыми значениями: {counters.get('filter_unknown', 0)}"
+        )
+        json_col, prom_col = st.columns(2)
+        json_col.download_button("JSON", METRICS.to_json(), file_name="auto_parser_metrics.json", mime="application/json")
+        prom_col.download_button("Prometheus", METRICS.to_prometheus(), file_name="auto_parser_metrics.prom", mime="text/plain")
+    
     st.header("⚡ Возможности")
     st.markdown("""
     - Автоопределение типа автомобилей
     - Обработка пагинации
+    - Параллельная загрузка страниц
+    - Отслеживание изменений между запусками
+    - Сохранение результатов на диск по мере парсинга
+    - Общий кэш результатов для повторных запросов
+    - Фоновые задачи с отменой и просмотром результатов
     - Парсинг характеристик
     - Экспорт в CSV
     - Показ статистики
@@ -0,0 +1 @@
+"""Scraping helpers for the Auto.ru parser"""
@@ -0,0 +1,163 @@
+"""Command-line entry point: scrape a list of URLs without the web UI.
+
+    python -m auto_parser urls.txt -o results --format parquet --rate 3
+
+URLs are scraped in parallel over one shared fetcher; the global --rate
+budget keeps the whole batch under the site's throttling threshold.
+"""
+import argparse
+import logging
+import re
+import sys
+from pathlib import Path
+
+from .settings import CACHE_DIR, RESULTS_DIR
+
+log = logging.getLogger('auto_parser')
+
+
+def read_urls(source):
+    """URLs from a file (or '-' for stdin), one per line; '#' starts a comment"""
+    lines = sys.stdin if source == '-' else Path(source).read_text(encoding='utf-8').splitlines()
+    urls = []
+    for line in lines:
+        line = line.split('#', 1)[0].strip()
+        if line:
+            urls.append(line)
+    return urls
+
+
+def output_name(url, kind):
+    """File name for the results of url"""
+    from .urls import normalize_url
+
+    slug = re.sub(r'[^0-9A-Za-z]+', '_', normalize_url(url).split('://', 1)[-1]).strip('_')
+    return f"auto_ru_{kind}_{slug[:120]}"
+
+
+def log_progress(url):
+    from . import scraper
+
+    def progress(event):
+        if event.stage == scraper.PAGE_DONE:
+            log.info("%s: page %d/%d, %d rows", url, event.page, event.pages, event.rows)
+        elif event.stage == scraper.CAPTCHA:
+            log.warning("%s: captcha on page %d", url, event.page)
+        elif event.stage == scraper.LOAD_FAILED:
+            log.warning("%s: page %d did not load", url, event.page)
+        elif event.stage == scraper.ERROR:
+            log.error("%s: error on page %d: %s", url, event.page, event.error)
+        elif event.stage == scraper.FINISHED and event.incomplete:
+            log.info("%s: %d cards with missing fields", url, event.incomplete)
+
+    return progress
+
+
+def write_metrics(path):
+    from .metrics import METRICS
+
+    text = METRICS.to_prometheus() if path.suffix == '.prom' else METRICS.to_json()
+    path.write_text(text, encoding='utf-8')
+    log.info("Metrics written to %s", path)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='auto_parser', description="Scrape Auto.ru listing URLs to files")
+    parser.add_argument('urls', help="file with one URL per line, or - to read stdin")
+    parser.add_argument('-o', '--output-dir', type=Path, default=RESULTS_DIR, help="where to write results (default: %(default)s)")
+    parser.add_argument('-f', '--format', choices=['csv', 'parquet', 'feather'], default='csv', help="output format (default: %(default)s)")
+    parser.add_argument('-w', '--workers', type=int, default=3, help="pages fetched in parallel (default: %(default)s)")
+    parser.add_argument('-u', '--url-workers', type=int, default=4, help="URLs scraped in parallel (default: %(default)s)")
+    parser.add_argument('--browsers', type=int, default=2, help="browsers shared by all URLs for the Selenium fallback (default: %(default)s)")
+    parser.add_argument('--rate', type=float, default=2.0, help="global page requests per second (default: %(default)s)")
+    parser.add_argument('--retries', type=int, default=3, help="retries after a captcha or network error (default: %(default)s)")
+    parser.add_argument('--backend', choices=['http', 'browser'], default='http', help="page fetch backend (default: %(default)s)")
+    parser.add_argument('--cache-ttl', type=float, default=0, help="reuse cached pages younger than this many seconds (default: always refetch)")
+    parser.add_argument('--cache-size', type=int, default=512, help="page cache size limit in MB (default: %(default)s)")
+    parser.add_argument('--replay', action='store_true', help="run offline from cached pages only")
+    parser.add_argument('--max-pages', type=int, default=None, help="stop after this many pages per URL (default: all)")
+    parser.add_argument('--max-mileage', type=int, default=None, help="used cars only: at most this many km, 0 for no limit (default: 1000)")
+    parser.add_argument('--year-from', type=int, default=None, help="oldest model year")
+    parser.add_argument('--year-to', type=int, default=None, help="newest model year")
+    parser.add_argument('--price-from', type=int, default=None, help="lowest price in rubles")
+    parser.add_argument('--price-to', type=int, default=None, help="highest price in rubles")
+    parser.add_argument('--transmission', action='append', choices=['AT', 'MT', 'AMT', 'CVT'], default=None,
+                        help="allowed transmission; repeat for several (default: any)")
+    parser.add_argument('--incremental', action='store_true', help="write only listings that are new or changed since the last run")
+    parser.add_argument('--metrics', type=Path, default=None, help="write stage timings and counters to this file (.prom for Prometheus text, JSON otherwise)")
+    parser.add_argument('-q', '--quiet', action='store_true', help="only log warnings and errors")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    logging.basicConfig(
+        level=logging.WARNING if args.quiet else logging.INFO,
+        format='%(asctime)s %(levelname)s %(message)s',
+    )
+
+    # Heavy modules are imported after argument parsing so --help stays fast
+    from .fetchers import make_fetcher
+    from .filters import filter_spec, filtered_url
+    from .page_cache import CachingFetcher, PageCache, ReplayFetcher
+    from .scheduler import RateLimiter, run_batch
+    from .scraper import detect_parser_type, scrape
+    from .sinks import open_sink
+    from .spec_cache import SpecCache
+    from .store import ListingStore
+
+    urls = read_urls(args.urls)
+    if not urls:
+        log.error("No URLs in %s", args.urls)
+        return 2
+
+    # Every fetched page is cached so that it can be replayed offline later
+    page_cache = PageCache(CACHE_DIR / 'pages', ttl=args.cache_ttl, max_bytes=args.cache_size * 1024 * 1024)
+    if args.replay:
+        fetcher = ReplayFetcher(page_cache)
+    else:
+        fetcher = CachingFetcher(make_fetcher(
+            args.backend, args.browsers, connections=args.url_workers * args.workers,
+            limiter=RateLimiter(args.rate, burst=max(1, int(args.rate))), retries=args.retries,
+        ), page_cache)
+    spec_cache = SpecCache(path=CACHE_DIR / 'specs.sqlite')
+    store = ListingStore(CACHE_DIR / 'listings.sqlite')
+
+    def scrape_url(url):
+        kind = detect_parser_type(url)
+        if kind is None:
+            raise ValueError("cannot tell new from used vehicles")
+
+        filters = filter_spec(
+            kind, max_mileage=args.max_mileage, min_year=args.year_from, max_year=args.year_to,
+            min_price=args.price_from, max_price=args.price_to, transmissions=tuple(args.transmission or ()),
+        )
+        # A narrower search gets its own output file and listing history
+        search = filtered_url(url, filters, kind)
+        path = args.output_dir / f"{output_name(search, kind)}.{args.format}"
+        run = store.begin(search)
+        with open_sink(path) as sink:
+            for frame in scrape(url, kind, fetcher, run, args.workers, args.incremental,
+                                spec_cache, log_progress(url), args.max_pages, filters):
+                sink.write(frame)
+        return path, sink.rows, len(run.disappeared)
+
+    failed = 0
+    try:
+        for url, result, error in run_batch(urls, scrape_url, args.url_workers):
+            if error is not None:
+                log.error("%s: scrape failed: %s", url, error)
+                failed += 1
+                continue
+            path, rows, disappeared = result
+            log.info("%s: %d rows written to %s", url, rows, path)
+            if disappeared:
+                log.info("%s: %d listings disappeared", url, disappeared)
+    finally:
+        fetcher.close()
+        spec_cache.close()
+        store.close()
+        if args.metrics is not None:
+            write_metrics(args.metrics)
+
+    return 1 if failed else 0
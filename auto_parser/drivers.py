@@ -0,0 +1,200 @@
+"""Selenium WebDriver setup and a pool of reusable drivers"""
+import json
+import os
+import queue
+import threading
+from contextlib import contextmanager
+
+from selenium import webdriver
+from selenium.common.exceptions import SessionNotCreatedException, WebDriverException
+from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.chrome.service import Service
+from webdriver_manager.chrome import ChromeDriverManager
+
+from .metrics import METRICS
+from .settings import CACHE_DIR
+
+CHROMEDRIVER_CACHE = CACHE_DIR / 'chromedriver.json'
+
+_chromedriver_path = None
+_chromedriver_lock = threading.Lock()
+
+
+def resolve_chromedriver_path(stale=None):
+    """Return the chromedriver path, installing it only when not cached on disk.
+
+    `stale` is a path that failed to start Chrome (a driver left behind by
+    a browser update); it is installed afresh unless another thread already
+    replaced it.
+    """
+    global _chromedriver_path
+    with _chromedriver_lock:
+        if _chromedriver_path and _chromedriver_path != stale and os.path.exists(_chromedriver_path):
+            return _chromedriver_path
+
+        try:
+            path = json.loads(CHROMEDRIVER_CACHE.read_text())['path']
+        except (OSError, ValueError, KeyError):
+            path = None
+        if path == stale:
+            path = None
+
+        if not path or not os.path.exists(path):
+            path = ChromeDriverManager().install()
+            try:
+                CHROMEDRIVER_CACHE.parent.mkdir(parents=True, exist_ok=True)
+                CHROMEDRIVER_CACHE.write_text(json.dumps({'path': path}))
+            except OSError:
+                pass  # Cache is an optimisation only
+
+        _chromedriver_path = path
+        return path
+
+
+# Resources the listing markup does not need
+BLOCKED_URLS = [
+    '*.png', '*.jpg', '*.jpeg', '*.gif', '*.webp', '*.avif', '*.svg', '*.ico',
+    '*.woff', '*.woff2', '*.ttf', '*.otf', '*.mp4', '*.webm',
+]
+
+
+def setup_driver():
+    """Setup Selenium WebDriver"""
+    options = Options()
+    options.add_argument("--start-maximized")
+    options.add_argument("--disable-blink-features=AutomationControlled")
+    options.add_argument("--headless")  # Run in headless mode for Streamlit
+    options.add_argument("--no-sandbox")
+    options.add_argument("--disable-dev-shm-usage")
+    options.add_argument("--blink-settings=imagesEnabled=false")
+    options.add_experimental_option("prefs", {
+        "profile.managed_default_content_settings.images": 2,
+        "profile.managed_default_content_settings.fonts": 2,
+    })
+    # Hand the page over once the DOM is parsed, without waiting for subresources
+    options.page_load_strategy = 'eager'
+
+    path = resolve_chromedriver_path()
+    try:
+        driver = webdriver.Chrome(service=Service(path), options=options)
+    except SessionNotCreatedException:
+        # The cached driver is for an older Chrome: install a matching one and cache it instead
+        driver = webdriver.Chrome(service=Service(resolve_chromedriver_path(stale=path)), options=options)
+    try:
+        driver.execute_cdp_cmd('Network.enable', {})
+        driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': BLOCKED_URLS})
+    except WebDriverException:
+        pass  # Blocking is an optimisation only
+    return driver
+
+
+def is_alive(driver):
+    """Check that the browser behind driver still responds"""
+    try:
+        driver.execute_script('return 1')
+        return True
+    except Exception:
+        return False
+
+
+class DriverPool:
+    """Bounded pool of warm WebDriver instances.
+
+    Drivers are started lazily, at most `size` of them, and handed out one
+    per thread via `driver()`. Idle drivers are reused by the next caller.
+    A driver is recycled after `max_pages` uses, when it fails the health
+    check on checkout, or when a WebDriverException escapes the `with` block.
+    """
+
+    def __init__(self, size=1, factory=setup_driver, max_pages=None):
+        self.size = max(1, int(size))
+        self.max_pages = max_pages
+        self._factory = factory
+        self._idle = queue.LifoQueue()
+        self._drivers = []
+        self._uses = {}
+        self._started = 0
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def driver(self):
+        """Borrow a driver for the duration of the `with` block"""
+        driver = self._checkout()
+        crashed = False
+        try:
+            yield driver
+        except WebDriverException:
+            crashed = True
+            raise
+        finally:
+            with self._lock:
+                self._uses[id(driver)] = self._uses.get(id(driver), 0) + 1
+                worn_out = self.max_pages and self._uses[id(driver)] >= self.max_pages
+            if crashed or worn_out:
+                self._retire(driver)
+            else:
+                self._idle.put(driver)
+
+    def _checkout(self):
+        while True:
+            try:
+                driver = self._idle.get_nowait()
+            except queue.Empty:
+                with self._lock:
+                    can_start = self._started < self.size
+                    if can_start:
+                        self._started += 1  # Reserve a slot before starting Chrome
+                if can_start:
+                    return self._start()
+                driver = self._idle.get()
+
+            if driver is None:
+                continue  # A retired driver freed its slot
+            if is_alive(driver):
+                return driver
+            self._retire(driver)
+
+    def _start(self):
+        try:
+            with METRICS.timer('driver_start'):
+                driver = self._factory()
+        except Exception:
+            with self._lock:
+                self._started -= 1
+            self._idle.put(None)
+            raise
+        with self._lock:
+            self._drivers.append(driver)
+        return driver
+
+    def _retire(self, driver):
+        with self._lock:
+            if driver in self._drivers:
+                self._drivers.remove(driver)
+                self._started -= 1
+            self._uses.pop(id(driver), None)
+        self._idle.put(None)  # Wake up a caller waiting for a free slot
+        try:
+            driver.quit()
+        except Exception:
+            pass
+
+    def close(self):
+        """Quit every driver started by the pool"""
+        with self._lock:
+            drivers, self._drivers = self._drivers, []
+            self._uses = {}
+            self._started = 0
+        while not self._idle.empty():
+            self._idle.get_nowait()
+        for driver in drivers:
+            try:
+                driver.quit()
+            except Exception:
+                pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
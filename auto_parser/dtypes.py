@@ -0,0 +1,58 @@
+"""Compact column types for scraped listings.
+
+Prices, mileage and years become nullable integers, engine volume a float
+and the low-cardinality text columns categoricals. Columns with a closed
+set of values (fuel, transmission, drive, status) get fixed categories, so
+frames from different pages concatenate without falling back to object.
+"""
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+from .specs import DRIVES, FUELS, TRANSMISSIONS
+
+INT_COLUMNS = ['Цена', 'Прежняя цена', 'Год выпуска', 'Пробег', 'power', 'base_options', 'extra_options']
+FLOAT_COLUMNS = ['engine_volume']
+# Columns whose values are known up front
+FIXED_CATEGORIES = {
+    'fuel_type': sorted(set(FUELS.values())),
+    'transmission': sorted(set(TRANSMISSIONS.values())),
+    'drive': sorted(set(DRIVES.values())),
+    'Статус': ['новое', 'изменилось', 'без изменений'],
+}
+# Columns whose values are discovered while scraping
+OPEN_CATEGORIES = ['Город', 'Дилер', 'Наличие', 'color']
+
+
+def to_int(values):
+    """Digits of each value as a nullable integer ('1 250 000 ₽' -> 1250000)"""
+    if pd.api.types.is_numeric_dtype(values):
+        return values.astype('Int64')
+    digits = values.astype('string').str.replace(r'\D', '', regex=True)
+    return pd.to_numeric(digits.where(digits != ''), errors='coerce').astype('Int64')
+
+
+def compact(df):
+    """Convert the known listing columns of df to compact types"""
+    df = df.copy()
+    for column in df.columns.intersection(INT_COLUMNS):
+        df[column] = to_int(df[column])
+    for column in df.columns.intersection(FLOAT_COLUMNS):
+        df[column] = pd.to_numeric(df[column], errors='coerce').astype('float64')
+    for column in df.columns.intersection(list(FIXED_CATEGORIES)):
+        df[column] = pd.Categorical(df[column], categories=FIXED_CATEGORIES[column])
+    for column in df.columns.intersection(OPEN_CATEGORIES):
+        df[column] = df[column].astype('string').astype('category')
+    return df
+
+
+def concat_frames(frames):
+    """Concatenate per-page frames, keeping open categorical columns categorical"""
+    frames = [frame for frame in frames if not frame.empty]
+    if not frames:
+        return pd.DataFrame()
+    df = pd.concat(frames, ignore_index=True)
+    for column in df.columns.intersection(OPEN_CATEGORIES):
+        parts = [frame[column] for frame in frames if column in frame.columns]
+        if len(parts) == len(frames) and all(isinstance(part.dtype, pd.CategoricalDtype) for part in parts):
+            df[column] = pd.Series(union_categoricals(parts, ignore_order=True), index=df.index)
+    return df
@@ -0,0 +1,17 @@
+"""Errors raised while fetching listing pages"""
+
+
+class PageError(Exception):
+    """Base class for page fetch errors"""
+
+
+class CaptchaError(PageError):
+    """Captcha was shown instead of the listing"""
+
+
+class PageLoadError(PageError):
+    """Listing elements did not appear on the page"""
+
+
+class NetworkError(PageLoadError):
+    """Transient failure (connection error, throttling, server error) worth retrying"""
@@ -0,0 +1,193 @@
+"""Card-scoped extraction of listings from page HTML.
+
+Each page is parsed once with lxml. The same parse yields the listings and
+the total number of result pages. Every listing card is walked once and
+turned into one record; a field that is absent from a card is set to None
+and named in the record's `missing` tuple, so one incomplete card can no
+longer shift the fields of the cards after it.
+"""
+import math
+import re
+from collections import namedtuple
+
+import lxml.html
+from lxml import etree
+
+
+class ListingPage(namedtuple('ListingPage', 'brand listings total_pages')):
+    """Listings of one page plus the number of pages in the whole result"""
+
+    __slots__ = ()
+
+    @property
+    def has_pagination(self):
+        return self.total_pages > 1
+
+
+NewListing = namedtuple('NewListing', 'brand model price dealer specs stock city url missing')
+UsedListing = namedtuple('UsedListing', 'brand model specs city year mileage price url missing')
+
+# field -> (tag, classes that must all be present)
+NEW_FIELDS = {
+    'model': ('a', 'Link CardGroupListingItem__titleLink'),
+    'price': ('span', 'OfferPriceCaption__price'),
+    'dealer': ('a', 'Link CardGroupListingItemFooter__dealerName'),
+    'specs': ('div', 'CardGroupListingItem__techSummary'),
+    'stock': ('ul', 'CardGroupListingItem__horizontalList'),
+    'city': ('span', 'MetroListPlace__regionName MetroListPlace_nbsp'),
+    'url': ('a', 'CardGroupListingItem__titleLink'),
+}
+
+USED_FIELDS = {
+    'model': ('div', 'ListingItem__title'),
+    'specs': ('div', 'ListingItemTechSummaryDesktop ListingItem__techSummary'),
+    'city': ('span', 'MetroListPlace__regionName MetroListPlace_nbsp'),
+    'year': ('div', 'ListingItem__year'),
+    'mileage': ('div', 'ListingItem__kmAge'),
+    'price': ('div', 'ListingItemPrice__content'),
+    'url': ('a', 'ListingItemTitle__link'),
+}
+
+
+def _has_class(tag, name):
+    return etree.XPath(f"//{tag}[contains(concat(' ', normalize-space(@class), ' '), ' {name} ')]")
+
+
+NEW_CARDS = _has_class('div', 'CardGroupListingItem')
+USED_CARDS = _has_class('div', 'ListingItem')
+BRAND = _has_class('h1', 'CardGroupHeaderDesktop__title-nZZMr')
+PAGINATION = _has_class('a', 'ListingPagination__page')
+OFFER_COUNT_TEXT = etree.XPath("//text()[contains(., 'предложени') or contains(., 'объявлени')]")
+
+PAGE_PARAM_RE = re.compile(r'[?&]page=(\d+)')
+OFFER_COUNT_RE = re.compile(r'(\d[\d\s\u00a0\u2009]*)\s*(?:предложени|объявлени)')
+
+
+def _compile(fields):
+    """Group selectors by tag so each element is checked only against its own tag"""
+    by_tag = {}
+    for name, (tag, classes) in fields.items():
+        by_tag.setdefault(tag, []).append((name, frozenset(classes.split())))
+    return by_tag
+
+
+_NEW_SELECTORS = _compile(NEW_FIELDS)
+_USED_SELECTORS = _compile(USED_FIELDS)
+
+
+def _card_fields(card, selectors):
+    """Walk one card and return the first element found for each field"""
+    found = {}
+    for el in card.iter(*selectors):
+        cls = el.get('class')
+        if not cls:
+            continue
+        classes = set(cls.split())
+        for name, required in selectors[el.tag]:
+            if name not in found and required <= classes:
+                found[name] = el
+    return found
+
+
+def text(el):
+    """Element text, like BeautifulSoup's `.text.strip()`"""
+    return el.text_content().strip()
+
+
+def stripped_text(el):
+    """Element text, like BeautifulSoup's `.get_text(strip=True)`"""
+    return ''.join(s.strip() for s in el.itertext())
+
+
+def href(el):
+    return el.get('href')
+
+
+def specs_text(el):
+    return ' '.join(stripped_text(div) for div in el.iterdescendants('div'))
+
+
+def _brand(root, default):
+    brand = BRAND(root)
+    if not brand:
+        return default
+    return text(brand[0]).replace("Купить", "")[:-10]
+
+
+def _total_pages(root, per_page):
+    """Number of result pages, from the pagination links or else from the offer count"""
+    numbers = []
+    for link in PAGINATION(root):
+        label = text(link)
+        if label.isdigit():
+            numbers.append(int(label))
+        match = PAGE_PARAM_RE.search(link.get('href', ''))
+        if match:
+            numbers.append(int(match.group(1)))
+    if numbers:
+        return max(numbers)
+
+    if per_page:
+        for node in OFFER_COUNT_TEXT(root):
+            match = OFFER_COUNT_RE.search(node)
+            if match:
+                offers = int(re.sub(r'\D', '', match.group(1)))
+                return max(1, math.ceil(offers / per_page))
+    return 1
+
+
+def _value(found, name, convert):
+    el = found.get(name)
+    return convert(el) if el is not None else None
+
+
+def extract_new(html):
+    """Extract new-vehicle listings and pagination state from a listing page"""
+    root = lxml.html.document_fromstring(html)
+    brand_name = _brand(root, "Unknown")
+
+    listings = []
+    for card in NEW_CARDS(root):
+        found = _card_fields(card, _NEW_SELECTORS)
+        listings.append(NewListing(
+            brand=brand_name,
+            model=_value(found, 'model', text),
+            price=_value(found, 'price', text),
+            dealer=_value(found, 'dealer', text),
+            specs=_value(found, 'specs', specs_text),
+            stock=_value(found, 'stock', text),
+            city=_value(found, 'city', text),
+            url=_value(found, 'url', href),
+            missing=tuple(name for name in NEW_FIELDS if name not in found),
+        ))
+    return ListingPage(brand_name, listings, _total_pages(root, len(listings)))
+
+
+def _mileage(el):
+    return text(el).replace('\xa0', ' ').replace('км', '').strip()
+
+
+def _used_price(el):
+    return text(el).replace('\xa0', ' ').replace('₽', '').strip()
+
+
+def extract_used(html):
+    """Extract used-vehicle listings and pagination state from a listing page"""
+    root = lxml.html.document_fromstring(html)
+    brand_name = _brand(root, "Неизвестно")
+
+    listings = []
+    for card in USED_CARDS(root):
+        found = _card_fields(card, _USED_SELECTORS)
+        listings.append(UsedListing(
+            brand=brand_name,
+            model=_value(found, 'model', stripped_text),
+            specs=_value(found, 'specs', specs_text),
+            city=_value(found, 'city', text),
+            year=_value(found, 'year', text),
+            mileage=_value(found, 'mileage', _mileage),
+            price=_value(found, 'price', _used_price),
+            url=_value(found, 'url', href),
+            missing=tuple(name for name in USED_FIELDS if name not in found),
+        ))
+    return ListingPage(brand_name, listings, _total_pages(root, len(listings)))
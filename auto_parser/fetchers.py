@@ -0,0 +1,193 @@
+"""Pluggable page fetch backends.
+
+Every fetcher has a `fetch(url, ready_class)` method that returns a `Page`
+or raises `CaptchaError` / `PageLoadError`. `ready_class` is the CSS class
+of a listing element that must be present for the page to count as loaded.
+"""
+from pathlib import Path
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from .exceptions import CaptchaError, NetworkError, PageError, PageLoadError
+from .metrics import METRICS
+
+HEADERS = {
+    'User-Agent': (
+        'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 '
+        '(KHTML, like Gecko) Chrome/124.0.0.0 Safari/537.36'
+    ),
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+    'Accept-Language': 'ru-RU,ru;q=0.9,en;q=0.8',
+}
+
+CAPTCHA_MARKERS = ('showcaptcha', 'smartcaptcha', 'captcha.yandex')
+
+
+class Page:
+    """Fetched listing page"""
+
+    __slots__ = ('url', 'html', 'source')
+
+    def __init__(self, url, html, source):
+        self.url = url
+        self.html = html
+        self.source = source
+
+    def __repr__(self):
+        return f"Page({self.url!r}, source={self.source!r}, {len(self.html)} chars)"
+
+
+def is_captcha(url, html):
+    """Check whether a response is a captcha challenge"""
+    url = url.lower()
+    return 'captcha' in url or any(marker in html for marker in CAPTCHA_MARKERS)
+
+
+def check_page(url, html, ready_class, source):
+    """Validate raw html and wrap it into a Page"""
+    if is_captcha(url, html):
+        raise CaptchaError(url)
+    if ready_class not in html:
+        raise PageLoadError(url)
+    return Page(url, html, source)
+
+
+class HttpFetcher:
+    """Plain HTTP fetcher with a pooled keep-alive session"""
+
+    def __init__(self, session=None, timeout=10, pool_size=10):
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+            session.mount('https://', adapter)
+            session.mount('http://', adapter)
+            session.headers.update(HEADERS)
+        self.session = session
+        self.timeout = timeout
+
+    def fetch(self, url, ready_class):
+        try:
+            with METRICS.timer('http_get'):
+                response = self.session.get(url, timeout=self.timeout)
+        except requests.RequestException as e:
+            raise NetworkError(url) from e
+        if is_captcha(response.url, response.text):
+            raise CaptchaError(url)
+        if response.status_code == 429 or response.status_code >= 500:
+            raise NetworkError(url)
+        if response.status_code != 200:
+            raise PageLoadError(url)
+        return check_page(url, response.text, ready_class, 'http')
+
+    def close(self):
+        self.session.close()
+
+
+class SeleniumFetcher:
+    """Fetcher that renders pages in a browser from a DriverPool.
+
+    A single wait returns as soon as either the listing or a captcha shows
+    up, instead of first waiting out a captcha check on every page.
+    """
+
+    CAPTCHA_XPATH = "//iframe[contains(@src, 'captcha')]"
+
+    def __init__(self, pool, timeout=10):
+        self.pool = pool
+        self.timeout = timeout
+
+    def close(self):
+        self.pool.close()
+
+    def fetch(self, url, ready_class):
+        # Imported lazily so HTTP-only users don't pay for Selenium
+        from selenium.common.exceptions import TimeoutException
+        from selenium.webdriver.common.by import By
+        from selenium.webdriver.support import expected_conditions as EC
+        from selenium.webdriver.support.ui import WebDriverWait
+
+        captcha = (By.XPATH, self.CAPTCHA_XPATH)
+        with self.pool.driver() as driver:
+            with METRICS.timer('browser_get'):
+                driver.get(url)
+
+            try:
+                with METRICS.timer('browser_wait'):
+                    WebDriverWait(driver, self.timeout, poll_frequency=0.1).until(EC.any_of(
+                        EC.presence_of_element_located((By.CLASS_NAME, ready_class)),
+                        EC.presence_of_element_located(captcha),
+                        EC.url_contains('captcha'),
+                    ))
+            except TimeoutException:
+                raise PageLoadError(url)
+
+            if 'captcha' in driver.current_url or driver.find_elements(*captcha):
+                raise CaptchaError(url)
+
+            html = driver.page_source
+
+        return Page(url, html, 'selenium')
+
+
+class FallbackFetcher:
+    """Try `primary` first and use `fallback` on captcha or an empty page"""
+
+    def __init__(self, primary, fallback):
+        self.primary = primary
+        self.fallback = fallback
+
+    def fetch(self, url, ready_class):
+        try:
+            return self.primary.fetch(url, ready_class)
+        except PageError:
+            return self.fallback.fetch(url, ready_class)
+
+    def close(self):
+        self.primary.close()
+        self.fallback.close()
+
+
+class FileFetcher:
+    """Offline fetcher serving saved HTML files.
+
+    `pages` maps URLs to file paths. Unknown URLs raise PageLoadError, so
+    it behaves like a site that has run out of pages.
+    """
+
+    def __init__(self, pages):
+        self.pages = {url: Path(path) for url, path in pages.items()}
+
+    def fetch(self, url, ready_class):
+        path = self.pages.get(url)
+        if path is None:
+            raise PageLoadError(url)
+        return check_page(url, path.read_text(encoding='utf-8'), ready_class, 'file')
+
+    def close(self):
+        pass
+
+
+def make_fetcher(backend='http', workers=1, max_pages=None, connections=None, limiter=None, retries=3, pool=None):
+    """HTTP fetcher with a browser fallback ('http') or a browser-only one ('browser').
+
+    `workers` caps the number of browsers, `connections` the HTTP pool size
+    (defaults to `workers`). `pool` is a DriverPool to share instead of
+    starting a new one. With a RateLimiter in `limiter`, every request
+    to the site, the browser fallback's included, takes a token and a
+    captcha on either backend backs off all callers.
+    """
+    # Selenium is imported only when a fetcher is built, not with this module
+    from .drivers import DriverPool
+    from .scheduler import RateLimitedFetcher
+
+    browser = SeleniumFetcher(pool or DriverPool(workers, max_pages=max_pages))
+    if limiter is not None:
+        browser = RateLimitedFetcher(browser, limiter, retries=retries)
+    if backend == 'browser':
+        return browser
+    http = HttpFetcher(pool_size=connections or workers)
+    if limiter is not None:
+        # Captchas go straight to the browser rather than being retried over HTTP
+        http = RateLimitedFetcher(http, limiter, retries=retries, retry_captcha=False)
+    return FallbackFetcher(http, browser)
@@ -0,0 +1,114 @@
+"""Search filters pushed into the Auto.ru query where possible.
+
+A `FilterSpec` becomes query parameters of the search URL, so the site
+only returns matching listings and fewer pages have to be fetched. The
+same spec is checked again on each extracted card, before any spec
+parsing, for whatever the site did not filter. A card whose value cannot
+be read (say, mileage written as text) is kept rather than dropped.
+"""
+from collections import namedtuple
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from .specs import transmission_code
+from .store import price_value
+
+FilterSpec = namedtuple(
+    'FilterSpec',
+    'max_mileage min_year max_year min_price max_price transmissions',
+    defaults=(None, None, None, None, None, ()),
+)
+
+# Filters applied when the caller gives none: the used-car search is for
+# practically new cars
+DEFAULT_FILTERS = {
+    'new': FilterSpec(),
+    'used': FilterSpec(max_mileage=1000),
+}
+
+# Our transmission codes -> Auto.ru `transmission` values
+TRANSMISSION_PARAMS = {
+    'AT': 'AUTOMATIC',
+    'MT': 'MECHANICAL',
+    'AMT': 'ROBOT',
+    'CVT': 'VARIATOR',
+}
+
+
+def query_params(spec, kind):
+    """Auto.ru query parameters for spec as (name, value) pairs"""
+    params = []
+    # New cars have no mileage to filter on
+    if spec.max_mileage is not None and kind == 'used':
+        params.append(('km_age_to', spec.max_mileage))
+    for name, value in (
+        ('year_from', spec.min_year),
+        ('year_to', spec.max_year),
+        ('price_from', spec.min_price),
+        ('price_to', spec.max_price),
+    ):
+        if value is not None:
+            params.append((name, value))
+    for code in spec.transmissions:
+        params.append(('transmission', TRANSMISSION_PARAMS[code]))
+    return [(name, str(value)) for name, value in params]
+
+
+def filtered_url(url, spec, kind):
+    """url with the query parameters of spec; filters already in the URL stay unless spec sets them"""
+    parts = urlsplit(url)
+    params = query_params(spec, kind)
+    if not params:
+        return url
+    replaced = {name for name, _ in params}
+    query = [(k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True) if k not in replaced]
+    return urlunsplit((parts.scheme, parts.netloc, parts.path, urlencode(query + params), parts.fragment))
+
+
+def filter_spec(kind, **values):
+    """The kind's default filters with the given values.
+
+    None keeps a default; a max_mileage of 0 lifts the mileage limit.
+    """
+    spec = DEFAULT_FILTERS[kind]._replace(**{name: value for name, value in values.items() if value is not None})
+    return spec._replace(max_mileage=None) if spec.max_mileage == 0 else spec
+
+
+def _number(text):
+    """Integer from the digits of text, or None"""
+    return price_value(text) if isinstance(text, str) else None
+
+
+def _within(value, low, high):
+    """Whether value is in [low, high]; None when the value is unknown"""
+    if value is None:
+        return None
+    return (low is None or value >= low) and (high is None or value <= high)
+
+
+def _checks(listing, spec):
+    """Results of the checks that apply to listing: True, False or None (unknown)"""
+    fields = listing._fields
+    if 'mileage' in fields and spec.max_mileage is not None:
+        yield _within(_number(listing.mileage), None, spec.max_mileage)
+    if 'year' in fields and (spec.min_year is not None or spec.max_year is not None):
+        yield _within(_number(listing.year), spec.min_year, spec.max_year)
+    if spec.min_price is not None or spec.max_price is not None:
+        yield _within(_number(listing.price), spec.min_price, spec.max_price)
+    if spec.transmissions:
+        code = transmission_code(listing.specs)
+        yield None if code is None else code in spec.transmissions
+
+
+def filter_listings(listings, spec):
+    """Listings that pass spec, plus the number dropped and the number kept with unreadable values"""
+    kept = []
+    dropped = unknown = 0
+    for listing in listings:
+        results = list(_checks(listing, spec))
+        if False in results:
+            dropped += 1
+            continue
+        if None in results:
+            unknown += 1
+        kept.append(listing)
+    return kept, dropped, unknown
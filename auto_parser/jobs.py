@@ -0,0 +1,263 @@
+"""Local background job queue for scrapes.
+
+Jobs are rows in a SQLite table and run in a pool of worker processes, so
+a long scrape ties up neither the caller's thread nor its interpreter.
+Workers write their progress to the table; callers poll it, ask for a
+running job to stop, and load finished results from the Parquet file each
+job writes.
+
+Each worker process builds its own fetcher and rate limiter. The queue's
+request rate is therefore split evenly between its worker processes, so
+jobs running at once stay within it together.
+"""
+import json
+import logging
+import multiprocessing
+import sqlite3
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+
+from .settings import CACHE_DIR, RESULTS_DIR
+
+log = logging.getLogger(__name__)
+
+# Job statuses
+QUEUED = 'queued'
+RUNNING = 'running'
+DONE = 'done'
+FAILED = 'failed'
+CANCELLED = 'cancelled'
+
+ACTIVE = (QUEUED, RUNNING)
+
+Job = namedtuple('Job', 'id url kind options status page pages rows error path created started finished')
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    url TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    options TEXT NOT NULL,
+    status TEXT NOT NULL,
+    page INTEGER NOT NULL DEFAULT 0,
+    pages INTEGER NOT NULL DEFAULT 0,
+    rows INTEGER NOT NULL DEFAULT 0,
+    error TEXT,
+    path TEXT,
+    cancel INTEGER NOT NULL DEFAULT 0,
+    created REAL NOT NULL,
+    started REAL,
+    finished REAL
+)
+'''
+
+_COLUMNS = 'id, url, kind, options, status, page, pages, rows, error, path, created, started, finished'
+
+
+class JobCancelled(Exception):
+    """The job was cancelled while running"""
+
+
+def _connect(path):
+    # Workers and the queue write to the same file from different processes
+    db = sqlite3.connect(str(path), timeout=30, check_same_thread=False)
+    db.execute('PRAGMA journal_mode=WAL')
+    return db
+
+
+def _job(row):
+    job = Job(*row)
+    return job._replace(options=json.loads(job.options))
+
+
+class JobQueue:
+    """Scrape jobs run by a pool of `workers` processes.
+
+    `submit()` options are passed to `scrape()`: backend, workers (pages in
+    parallel), incremental, max_pages, filters (FilterSpec fields as a dict)
+    and rate (page requests per second, a per-worker share of the queue's
+    `rate` by default). cache_ttl is the age in seconds
+    up to which cached pages are reused; by default every page is fetched.
+    """
+
+    def __init__(self, path=None, workers=2, results_dir=None, rate=2.0):
+        self.path = Path(path or CACHE_DIR / 'jobs.sqlite')
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.results_dir = Path(results_dir or RESULTS_DIR / 'jobs')
+        self._lock = threading.Lock()
+        self._db = _connect(self.path)
+        with self._lock:
+            self._db.execute(SCHEMA)
+            # Jobs that were running when the previous queue went away
+            self._db.execute(
+                'UPDATE jobs SET status = ?, error = ?, finished = ? WHERE status = ?',
+                (FAILED, 'interrupted', time.time(), RUNNING),
+            )
+            self._db.commit()
+            queued = [row[0] for row in self._db.execute('SELECT id FROM jobs WHERE status = ? ORDER BY id', (QUEUED,))]
+        self.workers = workers
+        self.rate = rate
+        self._executor = self._new_executor()
+        for job_id in queued:
+            self._start(job_id)
+
+    def _new_executor(self):
+        # Spawned workers do not inherit the threads of the parent (Streamlit's among them)
+        return ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context('spawn'))
+
+    def _start(self, job_id):
+        try:
+            future = self._executor.submit(run_job, str(self.path), job_id)
+        except BrokenProcessPool:
+            # A crashed worker breaks the whole pool; later jobs get a new one
+            self._executor = self._new_executor()
+            future = self._executor.submit(run_job, str(self.path), job_id)
+        future.add_done_callback(lambda f: self._check(job_id, f))
+
+    def _check(self, job_id, future):
+        # run_job records its own errors; this catches crashed workers
+        if future.cancelled():
+            return
+        error = future.exception()
+        if error is not None:
+            log.error("Job %d: worker failed: %s", job_id, error)
+            with self._lock:
+                self._db.execute(
+                    'UPDATE jobs SET status = ?, error = ?, finished = ? WHERE id = ? AND status IN (?, ?)',
+                    (FAILED, str(error), time.time(), job_id, *ACTIVE),
+                )
+                self._db.commit()
+
+    def submit(self, url, kind, **options):
+        """Queue a scrape of url and return the job id"""
+        options.setdefault('results_dir', str(self.results_dir))
+        options.setdefault('rate', self.rate / self.workers)
+        with self._lock:
+            cursor = self._db.execute(
+                'INSERT INTO jobs (url, kind, options, status, created) VALUES (?, ?, ?, ?, ?)',
+                (url, kind, json.dumps(options), QUEUED, time.time()),
+            )
+            self._db.commit()
+        self._start(cursor.lastrowid)
+        return cursor.lastrowid
+
+    def get(self, job_id):
+        with self._lock:
+            row = self._db.execute(f'SELECT {_COLUMNS} FROM jobs WHERE id = ?', (job_id,)).fetchone()
+        return _job(row) if row else None
+
+    def jobs(self, limit=50):
+        """Most recent jobs first"""
+        with self._lock:
+            rows = self._db.execute(f'SELECT {_COLUMNS} FROM jobs ORDER BY id DESC LIMIT ?', (limit,)).fetchall()
+        return [_job(row) for row in rows]
+
+    def cancel(self, job_id):
+        """Stop a job: queued jobs never start, running ones stop after the current page"""
+        with self._lock:
+            cursor = self._db.execute(
+                'UPDATE jobs SET cancel = 1, status = CASE status WHEN ? THEN ? ELSE status END, '
+                'finished = CASE status WHEN ? THEN ? ELSE finished END WHERE id = ? AND status IN (?, ?)',
+                (QUEUED, CANCELLED, QUEUED, time.time(), job_id, *ACTIVE),
+            )
+            self._db.commit()
+        return cursor.rowcount > 0
+
+    def result(self, job_id):
+        """DataFrame written by a finished (or cancelled) job, or None"""
+        import pandas as pd
+
+        job = self.get(job_id)
+        if job is None or job.path is None or not Path(job.path).exists():
+            return None
+        return pd.read_parquet(job.path)
+
+    def close(self, wait=False):
+        self._executor.shutdown(wait=wait, cancel_futures=True)
+        with self._lock:
+            self._db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close(wait=True)
+
+
+def run_job(db_path, job_id):
+    """Worker entry point: run one job and record its progress in the table"""
+    from .fetchers import make_fetcher
+    from .filters import FilterSpec
+    from .page_cache import CachingFetcher, PageCache, ReplayFetcher
+    from .scheduler import RateLimiter
+    from .scraper import CAPTCHA, ERROR, LOAD_FAILED, PAGE_DONE, scrape
+    from .sinks import ParquetSink
+    from .spec_cache import SpecCache
+    from .store import ListingStore
+
+    db = _connect(db_path)
+
+    def update(sql, *params):
+        db.execute(f'UPDATE jobs SET {sql} WHERE id = ?', (*params, job_id))
+        db.commit()
+
+    def cancelled():
+        return db.execute('SELECT cancel FROM jobs WHERE id = ?', (job_id,)).fetchone()[0]
+
+    def progress(event):
+        if event.stage == PAGE_DONE:
+            update('page = ?, pages = ?, rows = ?', event.page, event.pages, event.rows)
+        elif event.stage in (CAPTCHA, LOAD_FAILED):
+            update('error = ?', f"{event.stage} on page {event.page}")
+        elif event.stage == ERROR:
+            update('error = ?', f"page {event.page}: {event.error}")
+
+    cursor = db.execute(
+        'UPDATE jobs SET status = ?, started = ? WHERE id = ? AND status = ? AND cancel = 0',
+        (RUNNING, time.time(), job_id, QUEUED),
+    )
+    db.commit()
+    if cursor.rowcount == 0:
+        db.close()
+        return  # Cancelled before it started
+    job = _job(db.execute(f'SELECT {_COLUMNS} FROM jobs WHERE id = ?', (job_id,)).fetchone())
+    options = job.options
+    filters = FilterSpec(**options['filters']) if options.get('filters') is not None else None
+
+    page_cache = PageCache(CACHE_DIR / 'pages', ttl=options.get('cache_ttl', 0))
+    if options.get('backend') == 'replay':
+        fetcher = ReplayFetcher(page_cache)
+    else:
+        fetcher = CachingFetcher(make_fetcher(
+            options.get('backend', 'http'), connections=options.get('workers', 1),
+            limiter=RateLimiter(options.get('rate', 2.0)),
+        ), page_cache)
+    spec_cache = SpecCache(path=CACHE_DIR / 'specs.sqlite')
+    store = ListingStore(CACHE_DIR / 'listings.sqlite')
+    path = Path(options['results_dir']) / f'job_{job_id}.parquet'
+    try:
+        update('path = ?', str(path))
+        run = store.begin(job.url)
+        # One row group per page, so a job holds no more than a page in memory
+        with ParquetSink(path, batch_rows=1) as sink:
+            for frame in scrape(job.url, job.kind, fetcher, run, options.get('workers', 1),
+                                options.get('incremental', False), spec_cache, progress,
+                                options.get('max_pages'), filters):
+                sink.write(frame)
+                if cancelled():
+                    raise JobCancelled()
+        update('status = ?, rows = ?, finished = ?', DONE, sink.rows, time.time())
+    except JobCancelled:
+        update('status = ?, finished = ?', CANCELLED, time.time())
+    except Exception as e:
+        log.exception("Job %d failed", job_id)
+        update('status = ?, error = ?, finished = ?', FAILED, str(e), time.time())
+    finally:
+        fetcher.close()
+        spec_cache.close()
+        store.close()
+        db.close()
@@ -0,0 +1,142 @@
+"""Process-wide counters and stage timers for the scraping hot path.
+
+Modules record into the shared `METRICS` registry:
+
+    with METRICS.timer('extract'):
+        page = extract_new(html)
+    METRICS.incr('captcha')
+
+A snapshot can be exported as JSON or in the Prometheus text format. Jobs
+running in worker processes have registries of their own.
+"""
+import json
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+# What each metric measures; used as help text in exports
+DESCRIPTIONS = {
+    'driver_start': "Chrome startup",
+    'browser_get': "driver.get() of a listing page",
+    'browser_wait': "waiting for listings or a captcha in the browser",
+    'http_get': "HTTP request for a listing page",
+    'extract': "HTML parsing and card extraction of one page",
+    'specs': "spec string parsing of one page",
+    'frame': "DataFrame assembly of one page, spec parsing included",
+    'page': "fetch and extraction of one page",
+    'pages': "pages scraped",
+    'rows': "listings kept",
+    'captcha': "captcha responses",
+    'load_failed': "pages that did not load",
+    'empty_pages': "pages without listings",
+    'incomplete_cards': "cards with some fields missing",
+    'filtered_out': "listings dropped by the search filters after extraction",
+    'filter_unknown': "listings kept because a filtered field could not be read",
+    'page_cache_hits': "pages served from the page cache",
+    'page_cache_misses': "pages fetched past the page cache",
+}
+
+
+class Timer:
+    """Count, total, min and max of observed durations"""
+
+    __slots__ = ('count', 'total', 'min', 'max')
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.min = float('inf')
+        self.max = 0.0
+
+    def add(self, seconds):
+        self.count += 1
+        self.total += seconds
+        self.min = min(self.min, seconds)
+        self.max = max(self.max, seconds)
+
+    def as_dict(self):
+        return {
+            'count': self.count,
+            'total': self.total,
+            'mean': self.total / self.count if self.count else 0.0,
+            'min': self.min if self.count else 0.0,
+            'max': self.max,
+        }
+
+
+class Metrics:
+    """Thread-safe registry of counters, stage timers and recent page timings"""
+
+    def __init__(self, recent=200):
+        self._lock = threading.Lock()
+        self._counters = {}
+        self._timers = {}
+        self._pages = deque(maxlen=recent)
+        self.started = time.time()
+
+    def incr(self, name, n=1):
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + n
+
+    def observe(self, name, seconds):
+        with self._lock:
+            timer = self._timers.get(name)
+            if timer is None:
+                timer = self._timers[name] = Timer()
+            timer.add(seconds)
+
+    @contextmanager
+    def timer(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start)
+
+    def page(self, url, seconds, rows):
+        """Record the timing of one scraped page"""
+        self.observe('page', seconds)
+        with self._lock:
+            self._pages.append({'url': url, 'seconds': seconds, 'rows': rows, 'at': time.time()})
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                'since': self.started,
+                'counters': dict(self._counters),
+                'timers': {name: timer.as_dict() for name, timer in self._timers.items()},
+                'pages': list(self._pages),
+            }
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._timers.clear()
+            self._pages.clear()
+            self.started = time.time()
+
+    def to_json(self, indent=2):
+        return json.dumps(self.snapshot(), indent=indent, ensure_ascii=False)
+
+    def to_prometheus(self, prefix='auto_parser'):
+        """Snapshot in the Prometheus text exposition format"""
+        snapshot = self.snapshot()
+        lines = []
+        for name, value in sorted(snapshot['counters'].items()):
+            metric = f'{prefix}_{name}_total'
+            lines.append(f'# HELP {metric} {DESCRIPTIONS.get(name, name)}')
+            lines.append(f'# TYPE {metric} counter')
+            lines.append(f'{metric} {value}')
+        for name, timer in sorted(snapshot['timers'].items()):
+            metric = f'{prefix}_{name}_seconds'
+            lines.append(f'# HELP {metric} {DESCRIPTIONS.get(name, name)}')
+            lines.append(f'# TYPE {metric} summary')
+            lines.append(f'{metric}_count {timer["count"]}')
+            lines.append(f'{metric}_sum {timer["total"]:.6f}')
+            lines.append(f'# TYPE {metric}_max gauge')
+            lines.append(f'{metric}_max {timer["max"]:.6f}')
+        return '\n'.join(lines) + '\n'
+
+
+METRICS = Metrics()
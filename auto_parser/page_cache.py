@@ -0,0 +1,158 @@
+"""On-disk cache of raw page HTML with a TTL and a size cap.
+
+Pages are stored gzip-compressed under the SHA-256 of their normalized URL
+(query parameters, including `page`, are part of the key). Freshness is
+judged from the file modification time, and the least recently written
+files are evicted once the cache outgrows `max_bytes`.
+"""
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+from .exceptions import PageLoadError
+from .fetchers import check_page
+from .metrics import METRICS
+from .urls import TRACKING_PARAMS, normalize_url
+
+_CACHE_TTL = object()  # "Use the cache's own TTL"
+
+
+class PageCache:
+    """Compressed, content-addressed page store"""
+
+    def __init__(self, directory, ttl=None, max_bytes=512 * 1024 * 1024):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._size = sum(f.stat().st_size for f in self._files())
+
+    @staticmethod
+    def key(url):
+        return hashlib.sha256(normalize_url(url, TRACKING_PARAMS).encode()).hexdigest()
+
+    def _path(self, key):
+        return self.directory / key[:2] / f'{key}.html.gz'
+
+    def _files(self):
+        return self.directory.glob('*/*.html.gz')
+
+    def get(self, url, ttl=_CACHE_TTL):
+        """Return (html, meta) for url, or None when missing or older than ttl.
+
+        `ttl` defaults to the cache's own; pass None to accept any age.
+        """
+        ttl = self.ttl if ttl is _CACHE_TTL else ttl
+        path = self._path(self.key(url))
+        try:
+            if ttl is not None and time.time() - path.stat().st_mtime > ttl:
+                return None
+            with gzip.open(path, 'rt', encoding='utf-8') as f:
+                meta = json.loads(f.readline())
+                html = f.read()
+        except (OSError, EOFError, ValueError):
+            # EOFError: a truncated gzip file, say from a crash mid-write
+            return None
+        return html, meta
+
+    def put(self, url, html, source):
+        path = self._path(self.key(url))
+        path.parent.mkdir(exist_ok=True)
+        meta = json.dumps({'url': url, 'source': source, 'fetched': time.time()}, ensure_ascii=False)
+        data = gzip.compress(f'{meta}\n{html}'.encode('utf-8'), compresslevel=5)
+
+        # Process and thread id: job worker processes share the directory
+        tmp = path.with_name(f'{path.name}.{os.getpid()}.{threading.get_ident()}.tmp')
+        tmp.write_bytes(data)
+        with self._lock:
+            try:
+                self._size -= path.stat().st_size
+            except OSError:
+                pass
+            os.replace(tmp, path)
+            self._size += len(data)
+            if self._size > self.max_bytes:
+                self._evict()
+
+    def _evict(self):
+        """Drop the oldest files until the cache is 10% under its cap"""
+        target = self.max_bytes * 0.9
+        files = []
+        for f in self._files():
+            try:
+                st = f.stat()
+            except OSError:
+                continue
+            files.append((st.st_mtime, st.st_size, f))
+        files.sort()
+        self._size = sum(size for _, size, _ in files)
+        for _, size, f in files:
+            if self._size <= target:
+                break
+            try:
+                f.unlink()
+                self._size -= size
+            except OSError:
+                pass
+
+    def clear(self):
+        with self._lock:
+            for f in self._files():
+                f.unlink(missing_ok=True)
+            self._size = 0
+
+    @property
+    def size(self):
+        return self._size
+
+
+class CachingFetcher:
+    """Serve fresh pages from a PageCache and store everything fetched"""
+
+    def __init__(self, fetcher, cache):
+        self.fetcher = fetcher
+        self.cache = cache
+
+    def fetch(self, url, ready_class):
+        cached = self.cache.get(url)
+        if cached is not None:
+            html, _ = cached
+            try:
+                page = check_page(url, html, ready_class, 'cache')
+                METRICS.incr('page_cache_hits')
+                return page
+            except PageLoadError:
+                pass  # Cached an unusable page; fetch it again
+        METRICS.incr('page_cache_misses')
+        page = self.fetcher.fetch(url, ready_class)
+        self.cache.put(url, page.html, page.source)
+        return page
+
+    def close(self):
+        self.fetcher.close()
+
+
+class ReplayFetcher:
+    """Offline fetcher that only serves cached pages, whatever their age.
+
+    Pages that were never cached raise PageLoadError, which ends the
+    pagination just like the real end of a result.
+    """
+
+    def __init__(self, cache):
+        self.cache = cache
+
+    def fetch(self, url, ready_class):
+        cached = self.cache.get(url, ttl=None)
+        if cached is None:
+            raise PageLoadError(url)
+        html, _ = cached
+        return check_page(url, html, ready_class, 'replay')
+
+    def close(self):
+        pass
@@ -0,0 +1,36 @@
+"""Concurrent page fetching that keeps results in page order"""
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+
+def iter_pages(fetch_page, urls, workers=1):
+    """Fetch `urls` with up to `workers` threads and yield (url, rows) in order.
+
+    Iteration stops at the first page that returns no rows; pages already
+    scheduled after it are discarded. Exceptions raised by `fetch_page`
+    propagate to the caller in page order.
+    """
+    workers = max(1, int(workers))
+    urls = iter(urls)
+    executor = ThreadPoolExecutor(max_workers=workers)
+    pending = deque()
+    try:
+        for url in urls:
+            pending.append((url, executor.submit(fetch_page, url)))
+            if len(pending) >= workers:
+                break
+
+        while pending:
+            url, future = pending.popleft()
+            rows = future.result()
+            if not rows:
+                return
+            yield url, rows
+
+            next_url = next(urls, None)
+            if next_url is not None:
+                pending.append((next_url, executor.submit(fetch_page, next_url)))
+    finally:
+        for _, future in pending:
+            future.cancel()
+        executor.shutdown(wait=True, cancel_futures=True)
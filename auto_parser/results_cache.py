@@ -0,0 +1,108 @@
+"""In-process cache of finished scrape results.
+
+Results are keyed by the normalized search URL plus any options that change
+them, and are reused while they are younger than `ttl` seconds. When several
+callers ask for the same key at once, only the first one runs the scrape;
+the others wait for it and share its result. Cached results are shared
+objects and must not be modified by callers.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+from .urls import normalize_url
+
+
+class _Flight:
+    """A scrape in progress that other callers can wait on"""
+
+    __slots__ = ('done', 'result', 'error', 'finished')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.finished = False
+
+
+class ResultsCache:
+    """Bounded LRU of scrape results with a freshness window"""
+
+    def __init__(self, ttl=15 * 60, maxsize=32):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._entries = OrderedDict()  # key -> (finished at, result)
+        self._flights = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(url, *options):
+        return (normalize_url(url),) + options
+
+    def _fresh(self, key):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if time.time() - entry[0] > self.ttl:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def get(self, key):
+        """(finished at, result) of a fresh entry, or None"""
+        with self._lock:
+            return self._fresh(key)
+
+    def running(self, key):
+        """Whether some caller is computing key right now"""
+        with self._lock:
+            return key in self._flights
+
+    def run(self, key, compute, refresh=False):
+        """Return (finished at, result) for key, calling `compute()` only when needed.
+
+        A fresh entry is returned as is unless `refresh` is set. If another
+        caller is already computing key, this one waits for that result; an
+        exception raised by `compute` reaches every waiting caller.
+        """
+        while True:
+            with self._lock:
+                entry = None if refresh else self._fresh(key)
+                if entry is not None:
+                    return entry
+                flight = self._flights.get(key)
+                if flight is None:
+                    flight = self._flights[key] = _Flight()
+                    break
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            if flight.finished:
+                return flight.result
+            # The computing caller was interrupted; try again
+            refresh = False
+
+        try:
+            result = compute()
+        except Exception as e:
+            flight.error = e
+            raise
+        else:
+            entry = (time.time(), result)
+            with self._lock:
+                self._entries[key] = entry
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.maxsize:
+                    self._entries.popitem(last=False)
+            flight.result = entry
+            flight.finished = True
+            return entry
+        finally:
+            with self._lock:
+                self._flights.pop(key, None)
+            flight.done.set()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
@@ -0,0 +1,123 @@
+"""Batch scheduling: many URLs over one shared fetcher under a global rate limit.
+
+`RateLimiter` is a token bucket shared by every thread. `RateLimitedFetcher`
+takes a token before each request, backs the whole batch off when a
+captcha shows up and retries transient failures with jittered exponential
+delays. `run_batch` scrapes several URLs at once on top of that.
+"""
+import logging
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from .exceptions import CaptchaError, NetworkError
+
+log = logging.getLogger(__name__)
+
+
+class RateLimiter:
+    """Thread-safe token bucket allowing `rate` requests per second"""
+
+    def __init__(self, rate, burst=1, clock=time.monotonic, sleep=time.sleep):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = rate
+        self.burst = max(1, burst)
+        self._clock = clock
+        self._sleep = sleep
+        self._tokens = float(self.burst)
+        self._updated = clock()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Block until a request may be sent"""
+        while True:
+            with self._lock:
+                now = self._clock()
+                if now < self._paused_until:
+                    wait = self._paused_until - now
+                else:
+                    self._tokens = min(self.burst, self._tokens + max(0.0, now - self._updated) * self.rate)
+                    self._updated = now
+                    # Tolerance for float rounding, or a refill of 0.999... would wait forever
+                    if self._tokens >= 1 - 1e-9:
+                        self._tokens = max(0.0, self._tokens - 1)
+                        return
+                    wait = (1 - self._tokens) / self.rate
+            self._sleep(wait)
+
+    def pause(self, seconds):
+        """Hold back every caller for `seconds` (e.g. after a captcha)"""
+        with self._lock:
+            self._paused_until = max(self._paused_until, self._clock() + seconds)
+            # Tokens start refilling when the pause ends, not from before it
+            self._tokens = 0.0
+            self._updated = self._paused_until
+
+
+def backoff_delay(attempt, base=2.0, cap=60.0):
+    """Exponential delay with full jitter"""
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+
+class RateLimitedFetcher:
+    """Fetcher wrapper that enforces a shared rate limit and retries.
+
+    Wrap each backend that talks to the site, not a FallbackFetcher: the
+    fallback's request needs a token of its own. With `retry_captcha`
+    off, a captcha still pauses every caller but is raised at once, so a
+    FallbackFetcher can hand the page to its browser.
+    """
+
+    def __init__(self, fetcher, limiter, retries=3, backoff=2.0, max_backoff=60.0, sleep=time.sleep,
+                 retry_captcha=True):
+        self.fetcher = fetcher
+        self.limiter = limiter
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.retry_captcha = retry_captcha
+        self._sleep = sleep
+
+    def fetch(self, url, ready_class):
+        attempt = 0
+        while True:
+            self.limiter.acquire()
+            try:
+                return self.fetcher.fetch(url, ready_class)
+            except CaptchaError:
+                # A captcha means the site is throttling us: slow down everyone
+                delay = min(self.backoff * 2 ** attempt + backoff_delay(attempt, self.backoff, self.max_backoff),
+                            self.max_backoff)
+                log.warning("Captcha on %s, pausing all requests for %.1f s", url, delay)
+                self.limiter.pause(delay)
+                if not self.retry_captcha or attempt >= self.retries:
+                    raise
+            except NetworkError:
+                if attempt >= self.retries:
+                    raise
+                delay = backoff_delay(attempt, self.backoff, self.max_backoff)
+                log.info("Retrying %s in %.1f s", url, delay)
+                self._sleep(delay)
+            attempt += 1
+
+    def close(self):
+        self.fetcher.close()
+
+
+def run_batch(urls, job, workers=4):
+    """Run `job(url)` for every URL on `workers` threads.
+
+    Yields (url, result, error) as jobs finish; exactly one of result and
+    error is None.
+    """
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        futures = {executor.submit(job, url): url for url in urls}
+        for future in as_completed(futures):
+            url = futures[future]
+            try:
+                yield url, future.result(), None
+            except Exception as e:
+                yield url, None, e
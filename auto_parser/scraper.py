@@ -0,0 +1,221 @@
+"""Scraping pipeline: fetch -> extract -> parse specs, one DataFrame per page.
+
+Nothing here depends on Streamlit. Callers follow a scrape through the
+optional `progress(event)` callback, which receives `Progress` events.
+"""
+import time
+from collections import namedtuple
+
+import pandas as pd
+
+from .dtypes import compact
+from .exceptions import CaptchaError, PageLoadError
+from .extraction import NewListing, UsedListing, extract_new, extract_used
+from .filters import DEFAULT_FILTERS, filter_listings, filtered_url
+from .metrics import METRICS
+from .pagination import iter_pages
+from .specs import parse_specifications
+from .store import CHANGED, NEW, UNCHANGED
+from .urls import newest_first, page_url
+
+# Progress stages
+PAGE_DONE = 'page_done'
+CAPTCHA = 'captcha'
+LOAD_FAILED = 'load_failed'
+ERROR = 'error'
+FINISHED = 'finished'
+
+Progress = namedtuple('Progress', 'stage page pages rows incomplete error', defaults=(0, 0, 0, 0, None))
+
+# Listing record field -> DataFrame column
+NEW_COLUMNS = {
+    'brand': 'Модель',
+    'model': 'Комплектация',
+    'price': 'Цена',
+    'dealer': 'Дилер',
+    'specs': 'Спецификация',
+    'stock': 'Наличие',
+    'city': 'Город',
+    'url': 'Ссылка',
+}
+
+USED_COLUMNS = {
+    'brand': 'Марка',
+    'model': 'Модель',
+    'specs': 'Спецификация',
+    'city': 'Город',
+    'year': 'Год выпуска',
+    'mileage': 'Пробег',
+    'price': 'Цена',
+    'url': 'Ссылка',
+}
+
+STATUS_LABELS = {
+    NEW: 'новое',
+    CHANGED: 'изменилось',
+    UNCHANGED: 'без изменений',
+}
+
+
+ListingKind = namedtuple('ListingKind', 'name ready_class extract record columns drop_columns')
+
+KINDS = {
+    'new': ListingKind('new', 'CardGroupListingItem', extract_new, NewListing, NEW_COLUMNS, []),
+    'used': ListingKind('used', 'ListingItem__title', extract_used, UsedListing, USED_COLUMNS, ['Марка']),
+}
+
+
+def detect_parser_type(url):
+    """Detect if URL is for new or used vehicles"""
+    url_lower = url.lower()
+    if 'new' in url_lower:
+        return 'new'
+    elif 'used' in url_lower:
+        return 'used'
+    else:
+        return None
+
+
+def apply_changes(df, changes, incremental):
+    """Add change status columns and, in incremental mode, keep only new and changed rows"""
+    df['Статус'] = [STATUS_LABELS[c.status] for c in changes]
+    df['Прежняя цена'] = pd.array([c.old_price if c.status == CHANGED else None for c in changes], dtype='Int64')
+    if incremental:
+        # .loc, so that an empty page selects no rows rather than no columns
+        df = df.loc[[c.status != UNCHANGED for c in changes]].reset_index(drop=True)
+    return df
+
+
+def only_unchanged(changes):
+    """Whether a page had listings and all of them were seen before.
+
+    A page left empty by the filters says nothing about what comes after it.
+    """
+    return bool(changes) and all(c.status == UNCHANGED for c in changes)
+
+
+def listings_frame(listings, kind, changes=None, incremental=False, spec_cache=None):
+    """Turn one page of listing records into a cleaned DataFrame"""
+    df = pd.DataFrame(listings, columns=kind.record._fields).drop(columns='missing').rename(columns=kind.columns)
+    if changes is not None:
+        df = apply_changes(df, changes, incremental)
+
+    # Parse specifications
+    if not df.empty:
+        with METRICS.timer('specs'):
+            df = parse_specifications(df, cache=spec_cache)
+
+    # Integer price/mileage/year, categorical cities, dealers and spec codes
+    return compact(df.drop(columns=kind.drop_columns))
+
+
+def scrape(base_url, kind, fetcher, run=None, workers=1, incremental=False, spec_cache=None, progress=None,
+           max_pages=None, filters=None):
+    """Scrape a search result page by page, yielding one DataFrame per page.
+
+    `kind` is 'new' or 'used'. The number of pages is read from the first
+    page and all of them are fetched, unless `max_pages` is given. With a
+    ScrapeRun in `run` every listing is recorded and classified;
+    `incremental` then drops unchanged listings, sorts the search newest
+    first and stops at the first page that has nothing new.
+
+    `filters` is a FilterSpec (the kind's DEFAULT_FILTERS when None). It is
+    put into the search URL, and listings the site let through anyway are
+    dropped before they are recorded or their specs parsed.
+    """
+    filters = DEFAULT_FILTERS[kind] if filters is None else filters
+    base_url = filtered_url(base_url, filters, kind)
+    if incremental:
+        # Stopping at an unchanged page is only right when new offers come first
+        base_url = newest_first(base_url)
+    kind = KINDS[kind]
+    notify = progress or (lambda event: None)
+
+    def parse_page(html):
+        with METRICS.timer('extract'):
+            page = kind.extract(html)
+        if not page.listings:
+            METRICS.incr('empty_pages')
+        return page
+
+    def fetch_page(url):
+        start = time.perf_counter()
+        page = parse_page(fetcher.fetch(url, kind.ready_class).html)
+        METRICS.page(url, time.perf_counter() - start, len(page.listings))
+        return page
+
+    def keep(listings):
+        kept, dropped, unknown = filter_listings(listings, filters)
+        METRICS.incr('filtered_out', dropped)
+        METRICS.incr('filter_unknown', unknown)
+        return kept
+
+    def frame(listings, changes):
+        METRICS.incr('pages')
+        METRICS.incr('rows', len(listings))
+        METRICS.incr('incomplete_cards', sum(1 for listing in listings if listing.missing))
+        with METRICS.timer('frame'):
+            return listings_frame(listings, kind, changes, incremental, spec_cache)
+
+    def observe(listings):
+        return run.observe(listings) if run is not None else None
+
+    # First page; rows and pagination come from the same parse
+    try:
+        page = fetch_page(base_url)
+    except CaptchaError:
+        METRICS.incr('captcha')
+        notify(Progress(CAPTCHA, page=1))
+        page = None
+    except PageLoadError:
+        METRICS.incr('load_failed')
+        notify(Progress(LOAD_FAILED, page=1))
+        page = None
+    total_pages = page.total_pages if page else 1
+    pages = min(total_pages, max_pages) if max_pages else total_pages
+    # Disappeared listings can only be told apart after walking the whole result
+    complete = page is not None and not page.has_pagination
+    rows = incomplete = 0
+    changes = None
+    if page:
+        listings = keep(page.listings)
+        changes = observe(listings)
+        rows += len(listings)
+        incomplete += sum(1 for listing in listings if listing.missing)
+        yield frame(listings, changes)
+        notify(Progress(PAGE_DONE, 1, pages, rows, incomplete))
+
+    if page and pages > 1 and not (incremental and only_unchanged(changes)):
+        page_num = 2
+        urls = [page_url(base_url, n) for n in range(2, pages + 1)]
+
+        def fetch_listings(url):
+            return fetch_page(url).listings
+
+        try:
+            for _, page_data in iter_pages(fetch_listings, urls, workers=workers):
+                # Filtered after pagination, so a page whose cards were all dropped does not end the walk
+                page_data = keep(page_data)
+                changes = observe(page_data)
+                rows += len(page_data)
+                incomplete += sum(1 for listing in page_data if listing.missing)
+                yield frame(page_data, changes)
+                notify(Progress(PAGE_DONE, page_num, pages, rows, incomplete))
+                page_num += 1
+                if incremental and only_unchanged(changes):
+                    break  # Everything further down was seen before
+            else:
+                # Reached the real end of the result, not just the page limit
+                complete = page_num - 2 < len(urls) or pages == total_pages
+        except CaptchaError:
+            METRICS.incr('captcha')
+            notify(Progress(CAPTCHA, page_num, pages, rows, incomplete))
+        except PageLoadError:
+            METRICS.incr('load_failed')
+            notify(Progress(LOAD_FAILED, page_num, pages, rows, incomplete))
+        except Exception as e:
+            notify(Progress(ERROR, page_num, pages, rows, incomplete, e))
+
+    if run is not None:
+        run.finish(complete)
+    notify(Progress(FINISHED, pages=pages, rows=rows, incomplete=incomplete))
@@ -0,0 +1,9 @@
+"""Shared settings"""
+import os
+from pathlib import Path
+
+# Directory for on-disk caches (chromedriver path, parsed specs, pages, ...)
+CACHE_DIR = Path(os.environ.get('AUTO_PARSER_CACHE_DIR', Path.home() / '.cache' / 'auto_parser'))
+
+# Scrape results written page by page
+RESULTS_DIR = Path(os.environ.get('AUTO_PARSER_RESULTS_DIR', Path.cwd() / 'results'))
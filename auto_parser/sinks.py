@@ -0,0 +1,175 @@
+"""Append-only result sinks that write page by page.
+
+Each `write(df)` call goes straight to disk, so a crash mid-scrape keeps
+every page written before it and memory use does not grow with the scrape.
+"""
+from abc import ABC, abstractmethod
+from pathlib import Path
+
+import pandas as pd
+
+
+class CsvSink:
+    """CSV file written in batches; the header is written once"""
+
+    def __init__(self, path, encoding='utf-8-sig'):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.encoding = encoding
+        self.rows = 0
+        self._columns = None
+
+    def write(self, df):
+        if df.empty:
+            return
+        if self._columns is None:
+            self._columns = list(df.columns)
+            df.to_csv(self.path, index=False, encoding=self.encoding)
+        else:
+            # The BOM of utf-8-sig belongs only at the start of the file
+            encoding = 'utf-8' if self.encoding == 'utf-8-sig' else self.encoding
+            df.reindex(columns=self._columns).to_csv(
+                self.path, mode='a', header=False, index=False, encoding=encoding
+            )
+        self.rows += len(df)
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class _ArrowSink(ABC):
+    """Base for Arrow-based sinks (needs pyarrow).
+
+    Pages are buffered and written `batch_rows` at a time, which keeps row
+    groups large enough to read fast while memory stays bounded.
+    Categorical columns are written as dictionaries; categories seen in
+    earlier batches are kept in front, so each batch only extends the
+    previous dictionary.
+    """
+
+    def __init__(self, path, batch_rows=50_000):
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError as e:
+            raise RuntimeError(f"{type(self).__name__} needs pyarrow: pip install pyarrow") from e
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.batch_rows = batch_rows
+        self.rows = 0
+        self._writer = None
+        self._schema = None
+        self._categories = {}
+        self._pending = []
+        self._pending_rows = 0
+
+    def _prepare(self, df):
+        # Untyped text columns get a fixed string type, so a batch where a
+        # column is entirely empty still matches the schema
+        df = df.copy()
+        for column in df.columns:
+            if isinstance(df[column].dtype, pd.CategoricalDtype):
+                known = self._categories.get(column, pd.Index([], dtype='string'))
+                categories = known.append(df[column].cat.categories.astype('string').difference(known))
+                self._categories[column] = categories
+                df[column] = df[column].astype('string').astype(pd.CategoricalDtype(categories))
+            elif df[column].dtype == object or pd.api.types.is_string_dtype(df[column]):
+                df[column] = df[column].astype('string')
+        return df
+
+    @staticmethod
+    def _schema_of(table):
+        import pyarrow as pa
+
+        fields = [
+            field.with_type(pa.dictionary(pa.int32(), pa.string()))
+            if pa.types.is_dictionary(field.type) else field
+            for field in table.schema
+        ]
+        return pa.schema(fields, metadata=table.schema.metadata)
+
+    @abstractmethod
+    def _open(self, schema):
+        """Writer for the file at self.path"""
+
+    def _can_flush(self):
+        return True
+
+    def _flush(self):
+        import pyarrow as pa
+
+        if not self._pending:
+            return
+        table = pa.concat_tables(self._pending).combine_chunks()
+        if self._writer is None:
+            self._writer = self._open(self._schema)
+        self._writer.write_table(table)
+        self._pending = []
+        self._pending_rows = 0
+
+    def write(self, df):
+        import pyarrow as pa
+
+        if df.empty:
+            return
+        df = self._prepare(df)
+        if self._schema is None:
+            self._schema = self._schema_of(pa.Table.from_pandas(df, preserve_index=False))
+        self._pending.append(pa.Table.from_pandas(
+            df.reindex(columns=self._schema.names), schema=self._schema, preserve_index=False
+        ))
+        self._pending_rows += len(df)
+        self.rows += len(df)
+        if self._pending_rows >= self.batch_rows and self._can_flush():
+            self._flush()
+
+    def close(self):
+        self._flush()
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class ParquetSink(_ArrowSink):
+    """Parquet file written one row group per batch"""
+
+    def _open(self, schema):
+        import pyarrow.parquet as pq
+
+        return pq.ParquetWriter(self.path, schema, compression='zstd')
+
+
+class FeatherSink(_ArrowSink):
+    """Feather (Arrow IPC) file written one record batch per batch"""
+
+    def _open(self, schema):
+        import pyarrow as pa
+
+        options = pa.ipc.IpcWriteOptions(compression='zstd', emit_dictionary_deltas=True)
+        return pa.ipc.new_file(self.path, schema, options=options)
+
+    def _can_flush(self):
+        # IPC files accept dictionary deltas but not replacements, and an
+        # empty first dictionary can only be replaced
+        return self._writer is not None or all(len(c) for c in self._categories.values())
+
+
+def open_sink(path):
+    """Pick a sink from the file extension"""
+    path = Path(path)
+    if path.suffix == '.parquet':
+        return ParquetSink(path)
+    if path.suffix == '.feather':
+        return FeatherSink(path)
+    return CsvSink(path)
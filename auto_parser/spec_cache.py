@@ -0,0 +1,125 @@
+"""Memoizing cache for parsed spec strings.
+
+Keys are normalized spec strings, values are tuples in SPEC_COLUMNS order.
+Recent entries live in an in-memory LRU; with a `path` every entry is also
+written to a small SQLite file so later runs start warm. The file keeps
+the `maxsize` most recently written entries, and tables left by older
+PARSER_VERSIONs are dropped when it is opened.
+"""
+import json
+import sqlite3
+import sys
+import threading
+from collections import OrderedDict
+
+# Bump when the parsing rules change so stale entries are ignored
+PARSER_VERSION = 2
+
+_CHUNK = 500  # SQLite host-parameter limit is 999 on older builds
+
+
+class SpecCache:
+    """Bounded LRU of parsed specs with an optional on-disk store"""
+
+    def __init__(self, maxsize=100_000, path=None):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._lru = OrderedDict()
+        self._lock = threading.Lock()
+        self._table = f'specs_v{PARSER_VERSION}'
+        self._db = None
+        if path is not None:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            self._db = sqlite3.connect(str(path), timeout=30, check_same_thread=False)
+            self._db.execute(
+                f'CREATE TABLE IF NOT EXISTS {self._table} (spec TEXT PRIMARY KEY, parsed TEXT NOT NULL)'
+            )
+            stale = self._db.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'table' AND name LIKE 'specs_v%' AND name != ?",
+                (self._table,),
+            ).fetchall()
+            for (name,) in stale:
+                self._db.execute(f'DROP TABLE "{name}"')
+            self._db.commit()
+
+    @property
+    def hit_rate(self):
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def stats(self):
+        """Counters for display"""
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hit_rate,
+            'size': len(self._lru),
+        }
+
+    def get_many(self, keys):
+        """Return {key: parsed} for the keys that are cached"""
+        found = {}
+        with self._lock:
+            for key in keys:
+                value = self._lru.get(key)
+                if value is not None:
+                    self._lru.move_to_end(key)
+                    found[key] = value
+
+            missing = [key for key in keys if key not in found]
+            if self._db is not None and missing:
+                for start in range(0, len(missing), _CHUNK):
+                    chunk = missing[start:start + _CHUNK]
+                    placeholders = ','.join('?' * len(chunk))
+                    rows = self._db.execute(
+                        f'SELECT spec, parsed FROM {self._table} WHERE spec IN ({placeholders})', chunk
+                    )
+                    for key, parsed in rows:
+                        value = tuple(json.loads(parsed))
+                        found[key] = value
+                        self._remember(sys.intern(key), value)
+
+            self.hits += len(found)
+            self.misses += len(keys) - len(found)
+        return found
+
+    def put_many(self, items):
+        """Store {key: parsed} pairs"""
+        if not items:
+            return
+        with self._lock:
+            for key, value in items.items():
+                self._remember(sys.intern(key), tuple(value))
+            if self._db is not None:
+                self._db.executemany(
+                    f'INSERT OR REPLACE INTO {self._table} (spec, parsed) VALUES (?, ?)',
+                    ((key, json.dumps(list(value), ensure_ascii=False)) for key, value in items.items()),
+                )
+                # REPLACE gives a rewritten row a new rowid, so the lowest rowids are the oldest writes
+                self._db.execute(
+                    f'DELETE FROM {self._table} WHERE rowid IN '
+                    f'(SELECT rowid FROM {self._table} ORDER BY rowid DESC LIMIT -1 OFFSET ?)',
+                    (self.maxsize,),
+                )
+                self._db.commit()
+
+    def _remember(self, key, value):
+        self._lru[key] = value
+        self._lru.move_to_end(key)
+        while len(self._lru) > self.maxsize:
+            self._lru.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._lru.clear()
+            self.hits = self.misses = 0
+            if self._db is not None:
+                self._db.execute(f'DELETE FROM {self._table}')
+                self._db.commit()
+
+    def close(self):
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
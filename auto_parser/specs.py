@@ -0,0 +1,162 @@
+"""Vectorized parsing of the tech-summary ('Спецификация') strings.
+
+One engine serves both new and used listings. Every field is pulled out
+of the distinct strings at once with `Series.str.extract` and precompiled
+patterns, then converted to a typed column. Results can be memoized in a
+SpecCache.
+"""
+import re
+
+import pandas as pd
+
+SPEC_COLUMNS = [
+    'engine_volume', 'power', 'fuel_type', 'transmission',
+    'drive', 'color', 'base_options', 'extra_options',
+]
+
+# Like FUELS, in priority order: when a string names several, the first key wins
+TRANSMISSIONS = {
+    'механика': 'MT',
+    'механическая': 'MT',
+    'вариатор': 'CVT',
+    'робот': 'AMT',
+    'автомат': 'AT',
+    'акпп': 'AT',
+    'cvt': 'CVT',
+}
+
+FUELS = {
+    'дизель': 'Дизель',
+    'бензин': 'Бензин',
+    'электро': 'Электро',
+    'гибрид': 'Гибрид',
+    'газ': 'Газ',
+}
+
+# Checked in order: the first drive word found wins
+DRIVES = {
+    'передний': 'FWD',
+    'полный': 'AWD',
+    'задний': 'RWD',
+}
+
+ENGINE_RE = re.compile(r'(\d+\.\d)\s*л.?[\s\u2009]*/[\s\u2009]*(\d+)\s*л\.с\.')
+TRANSMISSION_RE = re.compile(r'\b(' + '|'.join(TRANSMISSIONS) + r')\b', re.IGNORECASE)
+COLOR_RE = re.compile(r'(?:' + '|'.join(DRIVES) + r')\s+(\w+)')
+BASE_OPTIONS_RE = re.compile(r'(\d+)\s+базов\w* опц\w*')
+EXTRA_OPTIONS_RE = re.compile(r'(\d+)\s+доп\.?\s+опц\w*')
+# Position of each word in its dict; FUELS and TRANSMISSIONS share no words
+_PRIORITY = {word: rank for rank, word in enumerate([*FUELS, *TRANSMISSIONS])}
+# Word boundary spelled out: \b in pyarrow's regex engine does not know Cyrillic letters
+NON_WORD = '[^0-9a-zа-яё_]'
+# Kept as a string so pyarrow-backed Series can run it natively
+WHITESPACE = '[\\s\u00a0\u2009\u202f]+'
+
+
+def _first_group(text, pattern):
+    return text.str.extract(pattern, expand=False)
+
+
+def _first_word(words, found):
+    """Code of the word in found that comes first in `words`, or None"""
+    if not found:
+        return None
+    if len(found) == 1:
+        return words[found[0].lower()]
+    return words[min((word.lower() for word in found), key=_PRIORITY.__getitem__)]
+
+
+def transmission_code(text):
+    """Transmission code of one spec string, or None"""
+    return _first_word(TRANSMISSIONS, TRANSMISSION_RE.findall(text or ''))
+
+
+def _first_code(text, words, whole_words=False):
+    """Per string, the code of the matched word that comes first in `words`.
+
+    The dict order decides, not the position in the string: 'гибрид
+    бензин' is Бензин, as in the per-row parser this replaced. Words are
+    applied last to first, so a higher-priority match overwrites the rest.
+    """
+    lower = text.str.lower()
+    codes = pd.Series(None, index=text.index, dtype=object)
+    for word, code in reversed(words.items()):
+        if whole_words:
+            found = lower.str.contains(f'(?:^|{NON_WORD}){word}(?:$|{NON_WORD})', regex=True)
+        else:
+            found = lower.str.contains(word, regex=False)
+        codes = codes.mask(found, code)
+    return codes
+
+
+def _to_int(values):
+    return pd.to_numeric(values, errors='coerce').astype('Int64')
+
+
+def _parse(text):
+    """Run the extraction patterns over a Series of normalized spec strings"""
+    engine = text.str.extract(ENGINE_RE)
+    drive = pd.Series(None, index=text.index, dtype=object)
+    for word, code in reversed(DRIVES.items()):
+        drive = drive.mask(text.str.contains(word, regex=False), code)
+
+    return pd.DataFrame({
+        'engine_volume': pd.to_numeric(engine[0], errors='coerce'),
+        'power': engine[1],
+        'fuel_type': _first_code(text, FUELS),
+        'transmission': _first_code(text, TRANSMISSIONS, whole_words=True),
+        'drive': drive,
+        'color': _first_group(text, COLOR_RE),
+        'base_options': _first_group(text, BASE_OPTIONS_RE),
+        'extra_options': _first_group(text, EXTRA_OPTIONS_RE),
+    }, index=text.index)
+
+
+def _typed(parsed):
+    parsed['engine_volume'] = pd.to_numeric(parsed['engine_volume'], errors='coerce').astype('float64')
+    for column in ('power', 'base_options', 'extra_options'):
+        parsed[column] = _to_int(parsed[column])
+    for column in ('fuel_type', 'transmission', 'drive', 'color'):
+        parsed[column] = parsed[column].astype(object).where(parsed[column].notna(), None)
+    return parsed
+
+
+def _as_tuples(parsed):
+    """Rows of parsed as plain tuples with None for missing values"""
+    plain = parsed.astype(object).where(parsed.notna(), None)
+    return list(plain.itertuples(index=False, name=None))
+
+
+def normalize_specs(text):
+    """Collapse whitespace (including thin and non-breaking spaces)"""
+    return text.fillna('').astype(str).str.replace(WHITESPACE, ' ', regex=True).str.strip()
+
+
+def parse_spec_series(text, cache=None):
+    """Parse a Series of spec strings into a DataFrame of typed columns.
+
+    Each distinct string is parsed once. With a SpecCache, strings seen in
+    earlier calls or runs are not parsed again.
+    """
+    normalized = normalize_specs(text)
+    codes, uniques = pd.factorize(normalized)
+    uniques = pd.Series(uniques, dtype=object)
+
+    if cache is None:
+        parsed = _parse(uniques.astype(str))
+    else:
+        known = cache.get_many(list(uniques))
+        todo = uniques[~uniques.isin(known)]
+        fresh = dict(zip(todo, _as_tuples(_parse(todo.astype(str))))) if len(todo) else {}
+        cache.put_many(fresh)
+        rows = [known[key] if key in known else fresh[key] for key in uniques]
+        parsed = pd.DataFrame(rows, columns=SPEC_COLUMNS, dtype=object)
+
+    parsed = _typed(parsed.take(codes).reset_index(drop=True))
+    parsed.index = text.index
+    return parsed
+
+
+def parse_specifications(df, column='Спецификация', cache=None):
+    """Append parsed spec columns to df"""
+    return pd.concat([df, parse_spec_series(df[column], cache)], axis=1)
@@ -0,0 +1,54 @@
+"""Aggregated price statistics for the results panel.
+
+Everything is computed with whole-column groupby operations; there are no
+per-group Python callbacks, so the cost grows with the number of rows and
+not with the number of groups times pandas call overhead.
+"""
+import hashlib
+
+import numpy as np
+import pandas as pd
+
+SPEC_MODE_COLUMNS = ['engine_volume', 'power', 'fuel_type', 'transmission', 'drive']
+
+
+def dataset_hash(df):
+    """Digest of the full contents of df, for caching derived results"""
+    digest = hashlib.sha256(str(list(df.columns)).encode())
+    digest.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+def group_modes(df, key, column):
+    """Most frequent non-null value of column per key.
+
+    Ties go to the smallest value, as with `Series.mode().iloc[0]`. Keys
+    with no values are left out.
+    """
+    pairs = df[[key, column]].dropna()
+    counts = pairs.groupby([key, column], observed=True, sort=False).size().rename('count').reset_index()
+    counts = counts.sort_values(['count', column], ascending=[False, True], kind='stable')
+    return counts.drop_duplicates(key).set_index(key)[column]
+
+
+def potential_price(mode_price):
+    """Suggested resale price: mode price plus margin, rounded to thousands"""
+    prices = pd.to_numeric(mode_price, errors='coerce').astype('float64')
+    return pd.Series(np.round((prices * 0.97 / 0.85 + 250_000) / 1000) * 1000, index=mode_price.index).astype('Int64')
+
+
+def price_ranges(df, key, price='Цена'):
+    """Per-key price range, listing count, mode price and typical specs.
+
+    Returns one row per key, sorted by minimum price, with the columns
+    min_price, max_price, count, mode_price, the modes of the spec columns
+    present in df and potential_price.
+    """
+    grouped = df.groupby(key, observed=True)[price]
+    stats = grouped.agg(['min', 'max', 'count']).rename(columns={'min': 'min_price', 'max': 'max_price'})
+    stats['mode_price'] = group_modes(df, key, price).reindex(stats.index)
+    for column in SPEC_MODE_COLUMNS:
+        if column in df.columns:
+            stats[column] = group_modes(df, key, column).reindex(stats.index)
+    stats['potential_price'] = potential_price(stats['mode_price'])
+    return stats.reset_index().sort_values('min_price', kind='stable').reset_index(drop=True)
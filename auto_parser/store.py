@@ -0,0 +1,139 @@
+"""Persistent store of seen listings for incremental re-scrapes.
+
+Listings are keyed by offer id within a scope (the normalized search URL)
+and carry a content hash. Each scrape is a `ScrapeRun` that classifies
+every listing it sees as new, changed or unchanged and, when the whole
+result set was walked, reports the listings that disappeared.
+"""
+import hashlib
+import json
+import re
+import sqlite3
+import threading
+import time
+from collections import namedtuple
+
+from .urls import normalize_url, offer_id
+
+NEW = 'new'
+CHANGED = 'changed'
+UNCHANGED = 'unchanged'
+DISAPPEARED = 'disappeared'
+
+Change = namedtuple('Change', 'status old_price price')
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS listings (
+    scope TEXT NOT NULL,
+    key TEXT NOT NULL,
+    hash TEXT NOT NULL,
+    price INTEGER,
+    data TEXT NOT NULL,
+    first_seen REAL NOT NULL,
+    last_seen REAL NOT NULL,
+    gone INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (scope, key)
+)
+'''
+
+
+def price_value(price):
+    """Integer rubles from a price string, or None"""
+    digits = re.sub(r'[^\d]', '', price or '')
+    return int(digits) if digits else None
+
+
+def listing_key(listing):
+    """Identity of a listing: its offer id, or its fields when there is no link"""
+    if listing.url:
+        return offer_id(listing.url)
+    return content_hash(listing)
+
+
+def content_hash(listing):
+    fields = listing._asdict()
+    fields.pop('missing', None)
+    return hashlib.sha1(json.dumps(fields, ensure_ascii=False, sort_keys=True).encode()).hexdigest()
+
+
+class ListingStore:
+    """SQLite table of listings seen by previous scrapes"""
+
+    def __init__(self, path):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(str(path), timeout=30, check_same_thread=False)
+        self._db.execute(SCHEMA)
+        self._db.commit()
+        self._lock = threading.Lock()
+
+    def begin(self, url):
+        """Start a scrape of the search at url"""
+        return ScrapeRun(self, normalize_url(url))
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+class ScrapeRun:
+    """One pass over a search result, recording what changed since the last one"""
+
+    def __init__(self, store, scope):
+        self.store = store
+        self.scope = scope
+        self.started = time.time()
+        self.disappeared = []
+
+    def observe(self, listings):
+        """Record listings and return a Change for each of them"""
+        db = self.store._db
+        now = time.time()
+        changes = []
+        with self.store._lock:
+            for listing in listings:
+                key = listing_key(listing)
+                digest = content_hash(listing)
+                price = price_value(listing.price)
+                row = db.execute(
+                    'SELECT hash, price, gone FROM listings WHERE scope = ? AND key = ?', (self.scope, key)
+                ).fetchone()
+
+                if row is None or row[2]:
+                    changes.append(Change(NEW, None, price))
+                elif row[0] != digest:
+                    changes.append(Change(CHANGED, row[1], price))
+                else:
+                    changes.append(Change(UNCHANGED, row[1], price))
+
+                db.execute(
+                    '''INSERT INTO listings (scope, key, hash, price, data, first_seen, last_seen, gone)
+                       VALUES (?, ?, ?, ?, ?, ?, ?, 0)
+                       ON CONFLICT (scope, key) DO UPDATE SET
+                           hash = excluded.hash, price = excluded.price, data = excluded.data,
+                           last_seen = excluded.last_seen, gone = 0''',
+                    (self.scope, key, digest, price, json.dumps(listing._asdict(), ensure_ascii=False), now, now),
+                )
+            db.commit()
+        return changes
+
+    def finish(self, complete):
+        """Close the run and return the data of listings that disappeared.
+
+        Disappearance can only be judged when `complete` is true, i.e. the
+        run walked the whole result set rather than stopping early.
+        """
+        if not complete:
+            return self.disappeared
+        db = self.store._db
+        with self.store._lock:
+            rows = db.execute(
+                'SELECT data FROM listings WHERE scope = ? AND gone = 0 AND last_seen < ?',
+                (self.scope, self.started),
+            ).fetchall()
+            db.execute(
+                'UPDATE listings SET gone = 1 WHERE scope = ? AND gone = 0 AND last_seen < ?',
+                (self.scope, self.started),
+            )
+            db.commit()
+        self.disappeared = [json.loads(data) for data, in rows]
+        return self.disappeared
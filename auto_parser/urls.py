@@ -0,0 +1,47 @@
+"""URL helpers"""
+import re
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+# Query parameters that never change the page content
+TRACKING_PARAMS = {'from', 'utm_source', 'utm_medium', 'utm_campaign', 'utm_content', 'utm_term'}
+# ... plus paging and sorting, which do not change the search itself
+IGNORED_PARAMS = TRACKING_PARAMS | {'page', 'sort'}
+
+# Auto.ru sort order listing the most recently placed offers first
+NEWEST_FIRST = 'cr_date-desc'
+
+OFFER_ID_RE = re.compile(r'/(\d+-[0-9a-f]+)/?$')
+
+
+def normalize_url(url, ignored=IGNORED_PARAMS):
+    """Canonical form of a listing URL: lower-case host, sorted query, no paging"""
+    parts = urlsplit(url.strip())
+    query = sorted((k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True) if k not in ignored)
+    path = parts.path.rstrip('/') + '/'
+    return urlunsplit((parts.scheme.lower() or 'https', parts.netloc.lower(), path, urlencode(query), ''))
+
+
+def offer_id(url):
+    """Stable id of an offer URL: the trailing '<number>-<hash>' segment, or the normalized URL"""
+    path = urlsplit(url).path
+    match = OFFER_ID_RE.search(path)
+    if match:
+        return match.group(1)
+    return normalize_url(url)
+
+
+def _with_param(url, name, value):
+    parts = urlsplit(url)
+    query = [(k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True) if k != name]
+    query.append((name, str(value)))
+    return urlunsplit((parts.scheme, parts.netloc, parts.path, urlencode(query), parts.fragment))
+
+
+def page_url(url, page):
+    """url with its `page` query parameter set to page"""
+    return _with_param(url, 'page', page)
+
+
+def newest_first(url):
+    """url sorted by placement date, newest offers first"""
+    return _with_param(url, 'sort', NEWEST_FIRST)
@@ -0,0 +1,97 @@
+"""Micro-benchmark: lxml card-scoped extraction vs the BeautifulSoup path.
+
+Usage: python benchmarks/bench_extraction.py [repeat]
+
+The pages in fixtures/ are synthetic: hand-written after Auto.ru's listing
+markup rather than saved from the site.
+"""
+import sys
+import timeit
+from pathlib import Path
+
+from bs4 import BeautifulSoup
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from auto_parser.extraction import extract_new, extract_used  # noqa: E402
+
+FIXTURES = Path(__file__).resolve().parent / 'fixtures'
+PAGINATION_CLASS = 'Button Button_color_whiteHoverBlue Button_disabled Button_checked Button_size_s Button_type_link Button_width_default ListingPagination__page'
+
+
+def bs4_new(html):
+    """Previous BeautifulSoup implementation for new vehicles"""
+    soup = BeautifulSoup(html, 'html.parser')
+
+    model_links = soup.find_all('a', class_='Link CardGroupListingItem__titleLink')
+    brand_element = soup.find('h1', class_='CardGroupHeaderDesktop__title-nZZMr')
+    brand_name = brand_element.text.strip().replace("Купить", "")[:-10] if brand_element else "Unknown"
+    prices = soup.find_all('span', class_='OfferPriceCaption__price')
+    dealers = soup.find_all('a', class_='Link CardGroupListingItemFooter__dealerName')
+    specs = soup.find_all('div', class_='CardGroupListingItem__techSummary')
+    stocks = soup.find_all('ul', class_='CardGroupListingItem__horizontalList')
+    cities = soup.find_all('span', class_='MetroListPlace__regionName MetroListPlace_nbsp')
+
+    data = []
+    min_length = min(len(model_links), len(prices), len(dealers), len(specs), len(stocks), len(cities))
+    for i in range(min_length):
+        specs_value = ' '.join(div.get_text(strip=True) for div in specs[i].find_all('div'))
+        data.append([brand_name, model_links[i].text.strip(), prices[i].text.strip(), dealers[i].text.strip(),
+                     specs_value, stocks[i].text.strip(), cities[i].text.strip()])
+
+    # Pagination used to be looked up in a second parse of the first page
+    pagination = BeautifulSoup(html, 'html.parser').find_all('a', class_=PAGINATION_CLASS)
+    return data, bool(pagination)
+
+
+def bs4_used(html):
+    """Previous BeautifulSoup implementation for used vehicles (without the mileage filter)"""
+    soup = BeautifulSoup(html, 'html.parser')
+
+    model_blocks = soup.find_all('div', class_='ListingItem__title')
+    specs_blocks = soup.find_all('div', class_='ListingItemTechSummaryDesktop ListingItem__techSummary')
+    cities = soup.find_all('span', class_='MetroListPlace__regionName MetroListPlace_nbsp')
+    years = soup.find_all('div', class_='ListingItem__year')
+    mileages = soup.find_all('div', class_='ListingItem__kmAge')
+    prices = soup.find_all('div', class_='ListingItemPrice__content')
+    brand_name_tag = soup.find('h1', class_='CardGroupHeaderDesktop__title-nZZMr')
+    brand_name = brand_name_tag.text.strip().replace("Купить", "")[:-10] if brand_name_tag else "Неизвестно"
+
+    data = []
+    min_length = min(len(model_blocks), len(specs_blocks), len(cities), len(years), len(mileages), len(prices))
+    for i in range(min_length):
+        specs_value = ' '.join(div.get_text(strip=True) for div in specs_blocks[i].find_all('div'))
+        mileage_value = mileages[i].text.strip().replace('\xa0', ' ').replace('км', '').strip()
+        price_value = prices[i].text.strip().replace('\xa0', ' ').replace('₽', '').strip()
+        data.append([brand_name, model_blocks[i].get_text(strip=True), specs_value, cities[i].text.strip(),
+                     years[i].text.strip(), mileage_value, price_value])
+
+    pagination = BeautifulSoup(html, 'html.parser').find_all('a', class_=PAGINATION_CLASS)
+    return data, bool(pagination)
+
+
+def lxml_new(html):
+    page = extract_new(html)
+    return [list(listing[:-2]) for listing in page.listings], page.has_pagination
+
+
+def lxml_used(html):
+    page = extract_used(html)
+    return [list(listing[:-2]) for listing in page.listings], page.has_pagination
+
+
+def bench(name, html, old, new, repeat):
+    assert old(html) == new(html), f"{name}: extraction results differ"
+    old_time = min(timeit.repeat(lambda: old(html), number=1, repeat=repeat))
+    new_time = min(timeit.repeat(lambda: new(html), number=1, repeat=repeat))
+    print(f"{name:<20} bs4 {old_time * 1000:8.2f} ms   lxml {new_time * 1000:8.2f} ms   x{old_time / new_time:5.1f}")
+
+
+def main():
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    bench('new_listing.html', (FIXTURES / 'new_listing.html').read_text(encoding='utf-8'), bs4_new, lxml_new, repeat)
+    bench('used_listing.html', (FIXTURES / 'used_listing.html').read_text(encoding='utf-8'), bs4_used, lxml_used, repeat)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,121 @@
+"""Benchmark: vectorized spec parsing vs the previous per-row apply.
+
+Usage: python benchmarks/bench_specs.py [rows] [legacy_rows]
+
+The legacy path is timed on a smaller sample (default 20 000 rows) and
+extrapolated, since it needs minutes for a million rows.
+"""
+import re
+import sys
+import time
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from auto_parser.spec_cache import SpecCache  # noqa: E402
+from auto_parser.specs import parse_spec_series  # noqa: E402
+from synthetic import synthetic_specs  # noqa: E402
+
+
+def legacy_parse(series):
+    """Previous implementation: one regex loop and one pd.Series per row"""
+    trans_dict = {'механика': 'MT', 'механическая': 'MT', 'вариатор': 'CVT', 'робот': 'AMT',
+                  'автомат': 'AT', 'акпп': 'AT', 'cvt': 'CVT'}
+    fuel_dict = {'дизель': 'Дизель', 'бензин': 'Бензин', 'электро': 'Электро', 'гибрид': 'Гибрид', 'газ': 'Газ'}
+
+    def parse_row(text):
+        result = {}
+        match = re.search(r'(\d+\.\d)\s*л.?[\s\u2009]*/[\s\u2009]*(\d+)\s*л\.с\.', text)
+        if match:
+            result['engine_volume'] = match.group(1)
+            result['power'] = int(match.group(2))
+        for key, value in fuel_dict.items():
+            if key in text.lower():
+                result['fuel_type'] = value
+                break
+        else:
+            result['fuel_type'] = None
+        for word, code in trans_dict.items():
+            if re.search(rf'\b{word}\b', text, flags=re.IGNORECASE):
+                result['transmission'] = code
+                break
+        else:
+            result['transmission'] = None
+        if 'передний' in text:
+            result['drive'] = 'FWD'
+        elif 'полный' in text:
+            result['drive'] = 'AWD'
+        elif 'задний' in text:
+            result['drive'] = 'RWD'
+        else:
+            result['drive'] = None
+        drive_match = re.search(r'(передний|полный|задний)\s+(\w+)', text)
+        if drive_match:
+            result['color'] = drive_match.group(2)
+        base_match = re.search(r'(\d+)\s+базов\w* опц\w*', text)
+        if base_match:
+            result['base_options'] = int(base_match.group(1))
+        extra_match = re.search(r'(\d+)\s+доп\.?\s+опц\w*', text)
+        if extra_match:
+            result['extra_options'] = int(extra_match.group(1))
+        return pd.Series(result)
+
+    return series.apply(parse_row)
+
+
+def check_same(old, new):
+    for column in old.columns:
+        expected = old[column]
+        actual = new[column]
+        if column == 'engine_volume':
+            expected = pd.to_numeric(expected)
+        mismatch = ~((expected.astype(object) == actual.astype(object)) | (expected.isna() & actual.isna()))
+        assert not mismatch.any(), f"{column}: {int(mismatch.sum())} rows differ"
+
+
+# Strings naming several fuels or transmissions: the dict order must win, not the position
+AMBIGUOUS = pd.Series([
+    '2.5 л / 245 л.с. / Гибрид бензин вариатор передний белый',
+    '1.6 л / 128 л.с. / Газ бензин механика полный серый',
+    '2.0 л / 150 л.с. / Бензин АКПП робот задний чёрный',
+    '3.0 л / 249 л.с. / Дизель автомат механическая полный синий',
+    'электро гибрид CVT механика',
+])
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    legacy_rows = min(rows, int(sys.argv[2]) if len(sys.argv) > 2 else 20_000)
+
+    specs = synthetic_specs(rows)
+
+    start = time.perf_counter()
+    parsed = parse_spec_series(specs)
+    new_time = time.perf_counter() - start
+
+    sample = specs.iloc[:legacy_rows]
+    start = time.perf_counter()
+    legacy = legacy_parse(sample)
+    legacy_time = (time.perf_counter() - start) * rows / legacy_rows
+
+    check_same(legacy, parsed.iloc[:legacy_rows])
+    check_same(legacy_parse(AMBIGUOUS), parse_spec_series(AMBIGUOUS))
+
+    cache = SpecCache(maxsize=rows)
+    parse_spec_series(specs, cache)
+    cache.hits = cache.misses = 0
+    start = time.perf_counter()
+    parse_spec_series(specs, cache)
+    cached_time = time.perf_counter() - start
+
+    print(f"{rows:,} spec strings")
+    print(f"legacy apply  {legacy_time:8.2f} s  (extrapolated from {legacy_rows:,} rows)")
+    print(f"vectorized    {new_time:8.2f} s")
+    print(f"warm cache    {cached_time:8.2f} s  (hit rate {cache.hit_rate:.0%})")
+    print(f"speedup       x{legacy_time / new_time:.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,183 @@
+"""Offline benchmark suite with a tracked baseline.
+
+Usage:
+    python benchmarks/run.py                      # run and compare with baseline.json
+    python benchmarks/run.py --sizes 1000,1000000 # choose dataset sizes (cards/rows)
+    python benchmarks/run.py --only specs         # cases whose name contains 'specs'
+    python benchmarks/run.py --save               # record the results as the new baseline
+
+Covers everything after the fetch: extraction from the fixture pages and
+from generated ones, spec parsing, price cleaning, DataFrame assembly and the stats
+aggregation. Exits with status 1 when a case is slower than its baseline by
+more than --tolerance. Baselines are only comparable on the same machine.
+
+The fixture pages are synthetic too: hand-written to mimic Auto.ru's
+listing markup, not saved from the site. Extraction is timed on them,
+not validated against the live markup.
+"""
+import argparse
+import json
+import platform
+import sys
+import time
+from datetime import date
+from pathlib import Path
+
+HERE = Path(__file__).resolve().parent
+sys.path.insert(0, str(HERE.parent))
+
+import lxml  # noqa: E402
+import pandas as pd  # noqa: E402
+
+from auto_parser.dtypes import to_int  # noqa: E402
+from auto_parser.extraction import extract_new, extract_used  # noqa: E402
+from auto_parser.scraper import KINDS, listings_frame  # noqa: E402
+from auto_parser.specs import parse_spec_series  # noqa: E402
+from auto_parser.stats import price_ranges  # noqa: E402
+from synthetic import listing_pages, listings  # noqa: E402
+
+FIXTURES = HERE / 'fixtures'
+BASELINE = HERE / 'baseline.json'
+DEFAULT_SIZES = [1_000, 10_000, 100_000]
+EXTRACT = {'new': extract_new, 'used': extract_used}
+# Rows are grouped by this column in the stats panel
+STATS_KEY = {'new': 'Комплектация', 'used': 'Модель'}
+
+
+def fixture_cases():
+    """Extraction of the hand-written fixture pages; size is the number of cards"""
+    for kind in ('new', 'used'):
+        html = (FIXTURES / f'{kind}_listing.html').read_text(encoding='utf-8')
+        extract = EXTRACT[kind]
+        yield f'extract_{kind}_fixture', len(extract(html).listings), lambda: extract(html)
+
+
+def _extract(kind, size):
+    extract = EXTRACT[kind]
+    pages = list(listing_pages(kind, size))
+    return lambda: [extract(html) for html in pages]
+
+
+def _specs(kind, size):
+    specs = pd.Series([record.specs for record in listings(kind, size)])
+    return lambda: parse_spec_series(specs)
+
+
+def _price_clean(kind, size):
+    prices = pd.Series([record.price for record in listings(kind, size)])
+    return lambda: to_int(prices)
+
+
+def _frame(kind, size):
+    records = listings(kind, size)
+    return lambda: listings_frame(records, KINDS[kind])
+
+
+def _stats(kind, size):
+    frame = listings_frame(listings(kind, size), KINDS[kind])
+    return lambda: price_ranges(frame, STATS_KEY[kind])
+
+
+# Case name -> setup(kind, size) returning the function to time; inputs are
+# built only for the cases that run
+SIZED_CASES = {
+    'extract': _extract,
+    'specs': _specs,
+    'price_clean': _price_clean,
+    'frame': _frame,
+    'stats': _stats,
+}
+
+
+def best_time(func, repeat, warmup=True):
+    if warmup:
+        func()  # First calls pay for imports and pandas' lazy initialization
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def run(sizes, repeat, only):
+    results = {}
+
+    def measure(name, size, func):
+        if only and only not in name:
+            return
+        key = f'{name}/{size}'
+        # Big inputs take long enough that one run is a stable measurement
+        small = size <= 100_000
+        results[key] = best_time(func, repeat if small else 1, warmup=small)
+        print(f'{key:<32} {results[key] * 1000:10.2f} ms  {results[key] / size * 1e6:8.2f} µs/item', flush=True)
+
+    for name, size, func in fixture_cases():
+        measure(name, size, func)
+    for size in sizes:
+        for kind in ('new', 'used'):
+            for case, setup in SIZED_CASES.items():
+                name = f'{case}_{kind}'
+                if not only or only in name:
+                    measure(name, size, setup(kind, size))
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """Print the cases slower than baseline; return how many regressed"""
+    regressions = 0
+    for key, seconds in results.items():
+        expected = baseline.get(key)
+        if expected is None:
+            continue
+        # The absolute slack keeps sub-millisecond cases from flapping on noise
+        if seconds > expected * (1 + tolerance) + 0.001:
+            regressions += 1
+            print(f'REGRESSION {key}: {seconds * 1000:.2f} ms vs {expected * 1000:.2f} ms baseline '
+                  f'(x{seconds / expected:.2f})')
+    return regressions
+
+
+def environment():
+    return {
+        'date': date.today().isoformat(),
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'pandas': pd.__version__,
+        'lxml': lxml.__version__,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--sizes', default=','.join(map(str, DEFAULT_SIZES)),
+                        help="comma-separated numbers of cards/rows (default: %(default)s)")
+    parser.add_argument('--repeat', type=int, default=3, help="runs per case, best is kept (default: %(default)s)")
+    parser.add_argument('--only', default=None, help="run only cases whose name contains this")
+    parser.add_argument('--baseline', type=Path, default=BASELINE, help="baseline file (default: %(default)s)")
+    parser.add_argument('--tolerance', type=float, default=0.3, help="allowed slowdown, 0.3 = 30%% (default: %(default)s)")
+    parser.add_argument('--save', action='store_true', help="merge the results into the baseline file")
+    args = parser.parse_args(argv)
+
+    sizes = [int(size) for size in args.sizes.split(',') if size]
+    results = run(sizes, args.repeat, args.only)
+
+    baseline = json.loads(args.baseline.read_text()) if args.baseline.exists() else {'results': {}}
+    if args.save:
+        baseline['environment'] = environment()
+        baseline['results'].update(results)
+        baseline['results'] = dict(sorted(baseline['results'].items()))
+        args.baseline.write_text(json.dumps(baseline, indent=2) + '\n')
+        print(f'Baseline saved to {args.baseline}')
+        return 0
+
+    if not baseline['results']:
+        print('No baseline yet; record one with --save')
+        return 0
+    regressions = compare(results, baseline['results'], args.tolerance)
+    print(f'{regressions} regression(s) against {args.baseline.name}' if regressions else 'No regressions')
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,149 @@
+"""Synthetic Auto.ru listing data for offline benchmarks.
+
+`listing_pages()` renders listing HTML with the same markup as the (equally
+synthetic) fixture pages, `listings()` builds the records extraction would return and
+`synthetic_specs()` the tech-summary strings. Everything is seeded, so the
+same arguments always give the same data.
+"""
+import random
+from html import escape
+
+import pandas as pd
+
+from auto_parser.extraction import NewListing, UsedListing
+
+PER_PAGE = 37  # Cards on one real listing page
+DISTINCT_PAGES = 50  # Larger runs cycle through this many rendered pages
+
+MODELS = ['Rio', 'Ceed', 'Sportage', 'Sorento', 'K5', 'Seltos', 'Carnival', 'Picanto']
+TRIMS = ['Classic', 'Comfort', 'Luxe', 'Prestige', 'Premium', 'GT-Line']
+VOLUMES = ['1.0', '1.4', '1.5', '1.6', '2.0', '2.5', '3.0']
+FUELS = ['Бензин', 'Дизель', 'Гибрид', 'Электро', 'Газ']
+TRANSMISSIONS = ['автомат', 'механика', 'робот', 'вариатор', 'АКПП']
+DRIVES = ['передний', 'полный', 'задний']
+COLORS = ['белый', 'чёрный', 'серый', 'синий', 'красный', 'серебристый']
+CITIES = ['Москва', 'Химки', 'Балашиха', 'Подольск', 'Мытищи', 'Королёв', 'Люберцы']
+
+
+def _spec_cells(rng, options=True):
+    cells = [
+        f"{rng.choice(VOLUMES)} л / {rng.randint(70, 400)} л.с. / {rng.choice(FUELS)}",
+        rng.choice(TRANSMISSIONS),
+        rng.choice(DRIVES),
+        rng.choice(COLORS),
+    ]
+    if options and rng.random() < 0.7:
+        cells.append(f"{rng.randint(5, 60)} базовых опций")
+    if options and rng.random() < 0.3:
+        cells.append(f"{rng.randint(1, 20)} доп. опций")
+    return cells
+
+
+def _price(rng):
+    return f"{rng.randint(9, 90) * 100_000:,}".replace(',', ' ') + ' ₽'
+
+
+def synthetic_specs(n, seed=0, options=True):
+    """n tech-summary strings shaped like the site's"""
+    rng = random.Random(seed)
+    return pd.Series([' '.join(_spec_cells(rng, options)) for _ in range(n)])
+
+
+def listings(kind, n, seed=0):
+    """n listing records as returned by extract_new/extract_used"""
+    rng = random.Random(seed)
+    records = []
+    for i in range(n):
+        model = rng.choice(MODELS)
+        if kind == 'new':
+            records.append(NewListing(
+                'Kia', f"{model} {rng.choice(VOLUMES)} {rng.choice(TRIMS)}", _price(rng),
+                f"Дилер {rng.randint(0, 40)}", ' '.join(_spec_cells(rng)), 'В наличии', rng.choice(CITIES),
+                f"https://auto.ru/cars/new/group/kia/{model.lower()}/{i}/", (),
+            ))
+        else:
+            records.append(UsedListing(
+                'Kia', f"Kia {model}", ' '.join(_spec_cells(rng, options=False)), rng.choice(CITIES),
+                str(rng.randint(2005, 2025)), f"{rng.choice([0, 50, 300, 900, 5_000, 45_000, 120_000]):,}".replace(',', ' ') + ' км',
+                _price(rng), f"https://auto.ru/cars/used/sale/kia/{model.lower()}/{i}/", (),
+            ))
+    return records
+
+
+def _new_card(rng, i):
+    model = rng.choice(MODELS)
+    cells = ''.join(f'<div class="CardGroupListingItem__techCell">{escape(c)}</div>' for c in _spec_cells(rng))
+    return (
+        f'<div class="CardGroupListingItem"><div class="CardGroupListingItem__gallery">'
+        f'<img class="Brazzers__image" src="//img.example/{i}.jpg" alt=""></div>\n'
+        f'<div class="CardGroupListingItem__info"><div class="CardGroupListingItem__title">'
+        f'<a class="Link CardGroupListingItem__titleLink" href="https://auto.ru/cars/new/group/kia/{model.lower()}/{i}/">'
+        f'{model} {rng.choice(VOLUMES)} {rng.choice(TRIMS)}</a></div>\n'
+        f'<div class="CardGroupListingItem__techSummary">{cells}</div>\n'
+        f'<ul class="CardGroupListingItem__horizontalList"><li class="CardGroupListingItem__horizontalListItem">'
+        f'В наличии</li></ul></div>\n'
+        f'<div class="CardGroupListingItem__price"><span class="OfferPriceCaption__price">{_price(rng)}</span></div>\n'
+        f'<div class="CardGroupListingItemFooter"><a class="Link CardGroupListingItemFooter__dealerName" '
+        f'href="/diler/{i}/">Дилер {rng.randint(0, 40)}</a>\n'
+        f'<span class="MetroListPlace MetroListPlace_nbsp"><span class="MetroListPlace__regionName MetroListPlace_nbsp">'
+        f'{rng.choice(CITIES)}</span></span></div></div>\n'
+    )
+
+
+def _used_card(rng, i):
+    model = rng.choice(MODELS)
+    cells = ''.join(
+        f'<div class="ListingItemTechSummaryDesktop__cell">{escape(c)}</div>' for c in _spec_cells(rng, options=False)
+    )
+    mileage = f"{rng.choice([0, 50, 300, 900, 5_000, 45_000, 120_000]):,}".replace(',', ' ')
+    return (
+        f'<div class="ListingItem"><div class="ListingItem__thumb"><img src="//img.example/u{i}.jpg" alt=""></div>\n'
+        f'<div class="ListingItem__main"><div class="ListingItem__title"><h3 class="ListingItemTitle">'
+        f'<a class="Link ListingItemTitle__link" href="https://auto.ru/cars/used/sale/kia/{model.lower()}/{i}/">'
+        f'Kia {model}</a></h3></div>\n'
+        f'<div class="ListingItemTechSummaryDesktop ListingItem__techSummary">{cells}</div>\n'
+        f'<div class="ListingItem__columnCellPrice"><div class="ListingItemPrice__content">{_price(rng)}</div></div>\n'
+        f'<div class="ListingItem__year">{rng.randint(2005, 2025)}</div>\n'
+        f'<div class="ListingItem__kmAge">{mileage} км</div>\n'
+        f'<span class="MetroListPlace MetroListPlace_nbsp"><span class="MetroListPlace__regionName MetroListPlace_nbsp">'
+        f'{rng.choice(CITIES)}</span></span></div></div>\n'
+    )
+
+
+def _pagination(page, pages):
+    links = ''.join(
+        f'<a class="Button Button_size_s Button_type_link ListingPagination__page" href="?page={n}">'
+        f'<span class="Button__content"><span class="Button__text">{n}</span></span></a>'
+        for n in sorted({1, max(1, page - 1), page, min(pages, page + 1), pages})
+    )
+    return f'<div class="ListingPagination"><div class="ListingPagination__pages">{links}</div></div>\n'
+
+
+def render_page(kind, cards, page=1, pages=1, seed=0):
+    """HTML of one listing page with `cards` cards"""
+    rng = random.Random(seed)
+    card = _new_card if kind == 'new' else _used_card
+    title = 'Купить новый Kia в Москве' if kind == 'new' else 'Купить Kia с пробегом в Москве'
+    body = ''.join(card(rng, (page - 1) * cards + i) for i in range(cards))
+    return (
+        '<!DOCTYPE html>\n<html lang="ru"><head><meta charset="utf-8"><title>Kia</title></head>\n<body>\n'
+        f'<div class="CardGroupHeaderDesktop"><h1 class="CardGroupHeaderDesktop__title-nZZMr">{title}</h1></div>\n'
+        f'<div class="ListingCars ListingCars_outputType_list">{body}</div>\n'
+        f'{_pagination(page, pages)}</body></html>\n'
+    )
+
+
+def listing_pages(kind, cards, per_page=PER_PAGE, seed=0):
+    """HTML pages holding `cards` cards in total, `per_page` to a page.
+
+    Only the first DISTINCT_PAGES pages are rendered; after that they
+    repeat, so a million cards do not need gigabytes of HTML.
+    """
+    pages = -(-cards // per_page)
+    rendered = [render_page(kind, per_page, n + 1, pages, seed + n) for n in range(min(pages, DISTINCT_PAGES))]
+    last = cards - (pages - 1) * per_page
+    for n in range(pages):
+        if n == pages - 1 and last != per_page:
+            yield render_page(kind, last, n + 1, pages, seed + n)
+        else:
+            yield rendered[n % len(rendered)]
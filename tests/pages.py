@@ -0,0 +1,42 @@
+"""Minimal listing pages for the scraper and extraction tests"""
+from auto_parser.extraction import UsedListing
+
+
+def used_card(n, year=2024, mileage='500', price='2 000 000', specs='1.6 л / 123 л.с. / Бензин автомат передний белый'):
+    return (
+        f'<div class="ListingItem"><div class="ListingItem__title"><h3 class="ListingItemTitle">'
+        f'<a class="Link ListingItemTitle__link" href="https://auto.ru/cars/used/sale/kia/rio/{n}-a{n}/">Kia Rio</a>'
+        f'</h3></div>'
+        f'<div class="ListingItemTechSummaryDesktop ListingItem__techSummary"><div>{specs}</div></div>'
+        f'<div class="ListingItemPrice__content">{price} ₽</div>'
+        f'<div class="ListingItem__year">{year}</div>'
+        f'<div class="ListingItem__kmAge">{mileage} км</div>'
+        f'<span class="MetroListPlace__regionName MetroListPlace_nbsp">Москва</span></div>'
+    )
+
+
+def listing_page(cards, pages=1):
+    """Listing page holding `cards`, with pagination links up to `pages`"""
+    links = ''.join(f'<a class="ListingPagination__page" href="?page={n}">{n}</a>' for n in range(1, pages + 1))
+    return (
+        f'<html><body><div class="ListingCars">{"".join(cards)}</div>'
+        f'<div class="ListingPagination">{links}</div></body></html>'
+    )
+
+
+def used_listing(year='2024', mileage='500', price='2 000 000', specs='Бензин автомат передний белый'):
+    return UsedListing('Kia', 'Kia Rio', specs, 'Москва', year, mileage, price, 'https://auto.ru/cars/used/sale/kia/rio/1-a1/', ())
+
+
+def new_card(n, dealer='Дилер', city='Москва'):
+    """New-car card; a dealer or city of None leaves that element out"""
+    return (
+        f'<div class="CardGroupListingItem">'
+        f'<a class="Link CardGroupListingItem__titleLink" href="https://auto.ru/cars/new/group/kia/rio/{n}/">Rio {n}</a>'
+        f'<span class="OfferPriceCaption__price">{n} 000 000 ₽</span>'
+        f'<div class="CardGroupListingItem__techSummary"><div>Бензин</div><div>автомат</div></div>'
+        f'<ul class="CardGroupListingItem__horizontalList"><li>В наличии</li></ul>'
+        + (f'<a class="Link CardGroupListingItemFooter__dealerName">{dealer}</a>' if dealer else '')
+        + (f'<span class="MetroListPlace__regionName MetroListPlace_nbsp">{city}</span>' if city else '')
+        + '</div>'
+    )
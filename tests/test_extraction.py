@@ -0,0 +1,21 @@
+from auto_parser.extraction import extract_new, extract_used
+
+from .pages import listing_page, new_card, used_card
+
+
+def test_card_without_dealer_and_city_keeps_the_others_aligned():
+    html = listing_page([new_card(1, dealer='Автомир', city='Москва'), new_card(2, dealer=None, city=None),
+                      new_card(3, dealer='Рольф', city='Химки')])
+    first, second, third = extract_new(html).listings
+    assert (first.model, first.dealer, first.city, first.missing) == ('Rio 1', 'Автомир', 'Москва', ())
+    assert (second.model, second.dealer, second.city) == ('Rio 2', None, None)
+    assert second.missing == ('dealer', 'city')
+    assert (third.model, third.dealer, third.city, third.missing) == ('Rio 3', 'Рольф', 'Химки', ())
+    assert second.specs == 'Бензин автомат'
+
+
+def test_used_cards_are_read_per_card():
+    page = extract_used(listing_page([used_card(1, mileage='900'), used_card(2, year=2023)], pages=3))
+    assert [(l.year, l.mileage) for l in page.listings] == [('2024', '900'), ('2023', '500')]
+    assert page.total_pages == 3
+    assert all(not l.missing for l in page.listings)
@@ -0,0 +1,69 @@
+from urllib.parse import parse_qsl, urlsplit
+
+from auto_parser.extraction import NewListing
+from auto_parser.filters import FilterSpec, filter_listings, filter_spec, filtered_url
+
+from .pages import used_listing
+
+USED = 'https://auto.ru/moskva/cars/kia/used/'
+
+
+def query(url):
+    return parse_qsl(urlsplit(url).query)
+
+
+def test_used_default_limits_mileage_in_url():
+    assert query(filtered_url(USED, filter_spec('used'), 'used')) == [('km_age_to', '1000')]
+
+
+def test_new_search_gets_no_mileage_param():
+    url = 'https://auto.ru/moskva/cars/kia/new/'
+    assert filtered_url(url, filter_spec('new', max_mileage=500), 'new') == url
+
+
+def test_spec_replaces_only_the_params_it_sets():
+    url = f'{USED}?price_from=500000&year_from=2010&from=searchline'
+    spec = filter_spec('used', max_mileage=0, min_price=1_000_000, transmissions=('AT', 'CVT'))
+    assert query(filtered_url(url, spec, 'used')) == [
+        ('year_from', '2010'), ('from', 'searchline'),
+        ('price_from', '1000000'), ('transmission', 'AUTOMATIC'), ('transmission', 'VARIATOR'),
+    ]
+
+
+def test_filter_spec_defaults():
+    assert filter_spec('used', max_mileage=None) == FilterSpec(max_mileage=1000)
+    assert filter_spec('used', max_mileage=0).max_mileage is None
+    assert filter_spec('new') == FilterSpec()
+
+
+def test_filter_listings_drops_out_of_range():
+    listings = [
+        used_listing(mileage='900'),
+        used_listing(mileage='5 000'),
+        used_listing(year='2009'),
+        used_listing(price='9 000 000'),
+    ]
+    spec = FilterSpec(max_mileage=1000, min_year=2010, max_price=5_000_000)
+    kept, dropped, unknown = filter_listings(listings, spec)
+    assert kept == listings[:1]
+    assert (dropped, unknown) == (3, 0)
+
+
+def test_unreadable_values_are_kept_and_counted():
+    listings = [used_listing(mileage=None), used_listing(mileage='нет данных'), used_listing(specs='')]
+    kept, dropped, unknown = filter_listings(listings, FilterSpec(max_mileage=1000, transmissions=('AT',)))
+    assert kept == listings
+    assert (dropped, unknown) == (0, 3)
+
+
+def test_transmission_uses_spec_priority():
+    # 'механика' comes before 'автомат' in TRANSMISSIONS
+    listing = used_listing(specs='Бензин автомат механика передний белый')
+    assert filter_listings([listing], FilterSpec(transmissions=('MT',)))[0] == [listing]
+    assert filter_listings([listing], FilterSpec(transmissions=('AT',)))[0] == []
+
+
+def test_fields_missing_from_the_record_are_not_checked():
+    listing = NewListing('Kia', 'Rio', '2 000 000 ₽', 'Дилер', 'Бензин автомат', 'В наличии', 'Москва', None, ())
+    kept, dropped, unknown = filter_listings([listing], FilterSpec(max_mileage=1000, min_year=2020))
+    assert (kept, dropped, unknown) == ([listing], 0, 0)
@@ -0,0 +1,19 @@
+from auto_parser.page_cache import PageCache
+
+URL = 'https://auto.ru/moskva/cars/kia/used/?page=2'
+
+
+def test_round_trip(tmp_path):
+    cache = PageCache(tmp_path)
+    cache.put(URL, '<html>Kia</html>', 'http')
+    html, meta = cache.get(URL)
+    assert html == '<html>Kia</html>'
+    assert (meta['url'], meta['source']) == (URL, 'http')
+
+
+def test_truncated_file_is_a_miss(tmp_path):
+    cache = PageCache(tmp_path)
+    cache.put(URL, '<html>' + 'Kia ' * 1000 + '</html>', 'http')
+    path = cache._path(cache.key(URL))
+    path.write_bytes(path.read_bytes()[:-20])
+    assert cache.get(URL) is None
@@ -0,0 +1,41 @@
+import threading
+import time
+
+import pytest
+
+from auto_parser.pagination import iter_pages
+
+
+def test_pages_come_back_in_order():
+    # Later pages finish first
+    def fetch(url):
+        time.sleep(0.01 * (5 - url))
+        return [url]
+
+    assert list(iter_pages(fetch, range(5), workers=4)) == [(n, [n]) for n in range(5)]
+
+
+def test_stops_at_first_empty_page():
+    fetched = []
+    lock = threading.Lock()
+
+    def fetch(url):
+        with lock:
+            fetched.append(url)
+        return [] if url == 2 else [url]
+
+    assert [url for url, _ in iter_pages(fetch, range(10), workers=2)] == [0, 1]
+    # Only a window of `workers` pages is ever scheduled ahead
+    assert max(fetched) <= 3
+
+
+def test_errors_surface_in_page_order():
+    def fetch(url):
+        if url == 1:
+            raise ValueError(url)
+        return [url]
+
+    pages = iter_pages(fetch, range(4), workers=3)
+    assert next(pages) == (0, [0])
+    with pytest.raises(ValueError):
+        next(pages)
@@ -0,0 +1,102 @@
+import pytest
+
+from auto_parser.exceptions import CaptchaError, NetworkError
+from auto_parser.fetchers import FallbackFetcher, Page
+from auto_parser.scheduler import RateLimitedFetcher, RateLimiter
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+        self.slept = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.slept.append(seconds)
+        self.now += seconds
+
+
+class FakeFetcher:
+    """Raises the queued errors, then returns a page"""
+
+    def __init__(self, *errors):
+        self.errors = list(errors)
+        self.calls = 0
+
+    def fetch(self, url, ready_class):
+        self.calls += 1
+        if self.errors:
+            raise self.errors.pop(0)(url)
+        return Page(url, '', 'fake')
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+def test_rate_must_be_positive():
+    with pytest.raises(ValueError):
+        RateLimiter(0)
+
+
+def test_acquire_spaces_requests(clock):
+    limiter = RateLimiter(2, burst=2, clock=clock, sleep=clock.sleep)
+    for _ in range(4):
+        limiter.acquire()
+    # The burst goes out at once, then one request every 1 / rate seconds
+    assert clock.slept == pytest.approx([0.5, 0.5])
+
+
+def test_pause_holds_back_callers(clock):
+    limiter = RateLimiter(10, clock=clock, sleep=clock.sleep)
+    limiter.acquire()
+    limiter.pause(5)
+    limiter.acquire()
+    assert clock.now >= 5
+
+
+def test_no_burst_right_after_a_pause(clock):
+    limiter = RateLimiter(1, burst=3, clock=clock, sleep=clock.sleep)
+    limiter.pause(30)
+    sent = []
+    for _ in range(3):
+        limiter.acquire()
+        sent.append(clock.now)
+    assert sent == pytest.approx([31, 32, 33])
+
+
+def test_network_errors_are_retried(clock):
+    limiter = RateLimiter(100, clock=clock, sleep=clock.sleep)
+    backend = FakeFetcher(NetworkError, NetworkError)
+    fetcher = RateLimitedFetcher(backend, limiter, retries=3, sleep=clock.sleep)
+    assert fetcher.fetch('u', 'ready').source == 'fake'
+    assert backend.calls == 3
+
+
+def test_captcha_pauses_everyone_even_when_not_retried(clock):
+    limiter = RateLimiter(100, clock=clock, sleep=clock.sleep)
+    fetcher = RateLimitedFetcher(FakeFetcher(CaptchaError), limiter, retry_captcha=False)
+    with pytest.raises(CaptchaError):
+        fetcher.fetch('u', 'ready')
+    assert limiter._paused_until > clock.now
+
+
+def test_fallback_request_takes_its_own_token(clock):
+    limiter = RateLimiter(1, clock=clock, sleep=clock.sleep)
+    acquired = []
+    acquire = limiter.acquire
+    limiter.acquire = lambda: (acquire(), acquired.append(clock.now))
+    fetcher = FallbackFetcher(
+        RateLimitedFetcher(FakeFetcher(CaptchaError), limiter, retry_captcha=False),
+        RateLimitedFetcher(FakeFetcher(), limiter),
+    )
+    assert fetcher.fetch('u', 'ready').source == 'fake'
+    assert len(acquired) == 2
+    # The browser request waits out the captcha backoff
+    assert acquired[1] > acquired[0]
@@ -0,0 +1,95 @@
+import pytest
+
+from auto_parser.fetchers import FileFetcher
+from auto_parser.filters import filter_spec, filtered_url
+from auto_parser.scraper import FINISHED, scrape
+from auto_parser.store import ListingStore
+from auto_parser.urls import newest_first, page_url
+
+from .pages import listing_page, used_card
+
+BASE = 'https://auto.ru/moskva/cars/kia/used/'
+FILTERS = filter_spec('used', min_year=2000)
+
+
+class RecordingFetcher(FileFetcher):
+    def __init__(self, pages):
+        super().__init__(pages)
+        self.fetched = []
+
+    def fetch(self, url, ready_class):
+        self.fetched.append(url)
+        return super().fetch(url, ready_class)
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = ListingStore(tmp_path / 'listings.sqlite')
+    yield store
+    store.close()
+
+
+def site(tmp_path, pages, incremental):
+    """FileFetcher serving `pages` (lists of cards) at the URLs scrape() asks for"""
+    search = filtered_url(BASE, FILTERS, 'used')
+    if incremental:
+        search = newest_first(search)
+    files = {}
+    for number, cards in enumerate(pages, start=1):
+        path = tmp_path / f'page{number}.html'
+        path.write_text(listing_page(cards, pages=len(pages)), encoding='utf-8')
+        files[search if number == 1 else page_url(search, number)] = path
+    return RecordingFetcher(files)
+
+
+def run_scrape(fetcher, store, incremental):
+    events = []
+    run = store.begin(filtered_url(BASE, FILTERS, 'used'))
+    frames = list(scrape(BASE, 'used', fetcher, run, incremental=incremental, progress=events.append, filters=FILTERS))
+    return frames, run, events[-1]
+
+
+def test_fully_filtered_page_does_not_end_the_walk(tmp_path, store):
+    fetcher = site(tmp_path, [[used_card(1)], [used_card(2, year=1999)], [used_card(3)]], incremental=False)
+    frames, run, finished = run_scrape(fetcher, store, incremental=False)
+    assert [len(frame) for frame in frames] == [1, 0, 1]
+    assert len(fetcher.fetched) == 3
+    assert finished.stage == FINISHED and finished.rows == 2
+
+
+@pytest.mark.parametrize('empty_page', [0, 1])
+def test_incremental_survives_a_fully_filtered_page(tmp_path, store, empty_page):
+    pages = [[used_card(1)], [used_card(2)], [used_card(3)]]
+    pages[empty_page] = [used_card(9, year=1999)]
+    fetcher = site(tmp_path, pages, incremental=True)
+    frames, run, finished = run_scrape(fetcher, store, incremental=True)
+    assert len(fetcher.fetched) == 3
+    assert sum(len(frame) for frame in frames) == 2
+    assert all(frame['Статус'].eq('новое').all() for frame in frames)
+
+
+def test_incremental_stops_at_first_unchanged_page(tmp_path, store):
+    pages = [[used_card(1)], [used_card(2)], [used_card(3)]]
+    run_scrape(site(tmp_path, pages, incremental=True), store, incremental=True)
+
+    pages[1] = [used_card(2, price='1 900 000')]
+    fetcher = site(tmp_path, pages, incremental=True)
+    frames, run, finished = run_scrape(fetcher, store, incremental=True)
+    # Page 1 only holds the seen offer 1: nothing further down can be new
+    assert len(fetcher.fetched) == 1
+    assert sum(len(frame) for frame in frames) == 0
+
+    pages[0] = [used_card(4), used_card(1)]
+    fetcher = site(tmp_path, pages, incremental=True)
+    frames, run, finished = run_scrape(fetcher, store, incremental=True)
+    assert len(fetcher.fetched) == 3
+    changed = [frame for frame in frames if len(frame)]
+    assert changed[0]['Статус'].tolist() == ['новое']
+    assert changed[1]['Статус'].tolist() == ['изменилось']
+    assert changed[1]['Прежняя цена'].tolist() == [2_000_000]
+
+
+def test_incremental_search_is_sorted_newest_first(tmp_path, store):
+    fetcher = site(tmp_path, [[used_card(1)]], incremental=True)
+    run_scrape(fetcher, store, incremental=True)
+    assert 'sort=cr_date-desc' in fetcher.fetched[0]
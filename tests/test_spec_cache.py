@@ -0,0 +1,31 @@
+import sqlite3
+
+from auto_parser import spec_cache
+from auto_parser.spec_cache import SpecCache
+
+ROW = (1.6, 123, 'Бензин', 'AT', 'FWD', 'белый', None, None)
+
+
+def tables(path):
+    with sqlite3.connect(path) as db:
+        return {name for (name,) in db.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+
+
+def test_file_keeps_the_newest_maxsize_rows(tmp_path):
+    path = tmp_path / 'specs.sqlite'
+    cache = SpecCache(maxsize=3, path=path)
+    for n in range(5):
+        cache.put_many({f'spec {n}': ROW})
+    cache.close()
+
+    reopened = SpecCache(path=path)
+    assert set(reopened.get_many([f'spec {n}' for n in range(5)])) == {'spec 2', 'spec 3', 'spec 4'}
+    reopened.close()
+
+
+def test_tables_of_other_parser_versions_are_dropped(tmp_path, monkeypatch):
+    path = tmp_path / 'specs.sqlite'
+    SpecCache(path=path).close()
+    monkeypatch.setattr(spec_cache, 'PARSER_VERSION', spec_cache.PARSER_VERSION + 1)
+    SpecCache(path=path).close()
+    assert tables(path) == {f'specs_v{spec_cache.PARSER_VERSION}'}
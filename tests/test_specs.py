@@ -0,0 +1,24 @@
+import pandas as pd
+
+from auto_parser.specs import parse_spec_series, transmission_code
+
+
+def test_fields_are_parsed():
+    parsed = parse_spec_series(pd.Series(['1.6 л / 123 л.с. / Бензин автомат передний белый 12 базовых опций']))
+    row = parsed.iloc[0]
+    assert (row['engine_volume'], row['power'], row['fuel_type']) == (1.6, 123, 'Бензин')
+    assert (row['transmission'], row['drive'], row['color'], row['base_options']) == ('AT', 'FWD', 'белый', 12)
+
+
+def test_dict_order_wins_over_position():
+    parsed = parse_spec_series(pd.Series(['Гибрид бензин автомат механика', 'газ CVT', '']))
+    assert parsed['fuel_type'].tolist() == ['Бензин', 'Газ', None]
+    assert parsed['transmission'].tolist() == ['MT', 'CVT', None]
+    assert transmission_code('АКПП механическая') == 'MT'
+    assert transmission_code(None) is None
+
+
+def test_transmission_needs_a_whole_word():
+    parsed = parse_spec_series(pd.Series(['Бензин автоматизированная', 'Бензин, автомат, передний', 'роботизированная']))
+    assert parsed['transmission'].tolist() == [None, 'AT', None]
+    assert transmission_code('Бензин автоматизированная') is None